@@ -1,10 +1,17 @@
 from flask import Flask
 from config import Config
-from app.extensions import db, ma, migrate, api
+from app.extensions import db, ma, compress
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
 import os
 from flask_restful import Api
+from app.representations import register_representations
+from app.idempotency import IdempotencyStore
+from app.profiling import RequestProfiler
+from app.metrics import MetricsRegistry
+from app.auth import TokenAuth
+from app.jobs import JobQueue
+from app.sharding import ShardMap
 import sqlite3
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
@@ -29,7 +36,13 @@ def configure_logging(app):
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir, exist_ok=True)
-    file_handler = RotatingFileHandler(os.path.join(log_dir, 'taskpro.log'), maxBytes=10240, backupCount=10)
+    log_path = os.path.join(log_dir, 'taskpro.log')
+    if app.config.get('LOG_MULTIPROCESS'):
+        # Several forked workers share the file: rotating in-process would race,
+        # so only append and reopen when an external logrotate moves the file.
+        file_handler = WatchedFileHandler(log_path, delay=True)
+    else:
+        file_handler = RotatingFileHandler(log_path, maxBytes=10240, backupCount=10, delay=True)
     file_handler.setFormatter(log_format)
     file_handler.setLevel(logging.INFO)
     
@@ -44,6 +57,13 @@ def configure_logging(app):
         app.logger.addHandler(stream_handler)
 
 
+def init_migrate(app):
+    # Deferred import: Flask-Migrate loads Alembic, which is a noticeable
+    # share of startup time and is never used while serving requests.
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
@@ -55,18 +75,49 @@ def create_app(config_class=Config):
 
     # Initialize Extensions
     db.init_app(app)
+    ShardMap(app)
     ma.init_app(app)
-    migrate.init_app(app, db)
+    if not app.config.get('SERVING_MODE'):
+        init_migrate(app)
+    compress.init_app(app)
+    IdempotencyStore(app)
+    RequestProfiler(app)
+    MetricsRegistry(app)
+    TokenAuth(app)
+    JobQueue(app)
     api = Api(app)
+    register_representations(api)
     
-    from app.resources import UserResource, UserListResource, TaskListResource, TaskResource
+    from app.resources import (
+        UserResource, UserListResource, TaskListResource, TaskResource, TaskChangesResource,
+        BatchResource, AdmissionResource, LoginResource, LogoutResource, TaskExportResource,
+        JobResource, JobResultResource
+    )
+    from app.admission import AdmissionControl
     api.add_resource(UserListResource, '/users')
     api.add_resource(UserResource, '/users/<int:user_id>')
     api.add_resource(TaskListResource, '/users/<int:user_id>/tasks', endpoint='tasksresource')
     api.add_resource(TaskResource, '/users/<int:user_id>/tasks/<int:task_id>')
+    api.add_resource(TaskChangesResource, '/users/<int:user_id>/tasks/changes')
+    api.add_resource(TaskExportResource, '/users/<int:user_id>/tasks/export')
+    api.add_resource(BatchResource, '/batch')
+    api.add_resource(AdmissionResource, '/admission')
+    api.add_resource(LoginResource, '/auth/login')
+    api.add_resource(LogoutResource, '/auth/logout')
+    api.add_resource(JobResource, '/jobs/<int:job_id>')
+    api.add_resource(JobResultResource, '/jobs/<int:job_id>/result')
 
-    # Register API Resources (we will add these shortly)
-    api.init_app(app)
+    # Admission control for the expensive endpoints
+    admission = AdmissionControl(app)
+    queue = dict(max_queue=app.config['ADMISSION_QUEUE_SIZE'], queue_timeout=app.config['ADMISSION_QUEUE_TIMEOUT'])
+    admission.limit('userlistresource', 'POST', concurrency=app.config['USER_CREATE_CONCURRENCY'],
+                    rate=app.config['USER_CREATE_RATE'], burst=app.config['USER_CREATE_BURST'], **queue)
+    # Login verifies a password hash too, and is the target of guessing
+    admission.limit('loginresource', 'POST', concurrency=app.config['USER_CREATE_CONCURRENCY'],
+                    rate=app.config['LOGIN_RATE'], burst=app.config['LOGIN_BURST'], **queue)
+    for endpoint, method in [('userlistresource', 'DELETE'), ('tasksresource', 'DELETE'),
+                             ('tasksresource', 'PATCH'), ('batchresource', 'POST')]:
+        admission.limit(endpoint, method, concurrency=app.config['BULK_CONCURRENCY'], **queue)
 
     # Import models to register them with SQLAlchemy
     from app import models
@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from flask import request
+
+ENVIRON_KEY = "taskpro.admission"
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """Returns (allowed, seconds until a token is available)."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True, 0
+            return False, (1 - self.tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight requests. Up to `max_queue` extra requests may wait at most
+    `queue_timeout` seconds for a slot, everything beyond that is rejected.
+    """
+
+    def __init__(self, limit, max_queue=0, queue_timeout=0.0):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.cond = threading.Condition()
+
+    def acquire(self):
+        with self.cond:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.max_queue or self.queue_timeout <= 0:
+                return False
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self.cond.wait(remaining)
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify()
+
+
+class Rule:
+    def __init__(self, endpoint, method, concurrency=None, rate=None, burst=None,
+                 max_queue=0, queue_timeout=0.0, retry_after=1):
+        self.endpoint = endpoint
+        self.method = method
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limiter = ConcurrencyLimiter(concurrency, max_queue, queue_timeout) if concurrency else None
+        self.retry_after = retry_after
+        self.admitted = 0
+        self.rate_limited = 0
+        self.shed = 0
+
+    def stats(self):
+        return {
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "admitted": self.admitted,
+            "rejected_rate_limit": self.rate_limited,
+            "rejected_overload": self.shed,
+            "in_flight": self.limiter.active if self.limiter else None,
+            "queue_depth": self.limiter.waiting if self.limiter else None,
+            "concurrency_limit": self.limiter.limit if self.limiter else None,
+        }
+
+
+class AdmissionControl:
+    """
+    Per-endpoint admission control. Rules are registered next to the
+    resources in create_app; rejected requests never reach the handler.
+    """
+
+    def __init__(self, app=None):
+        self.rules = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["admission"] = self
+        if app.config.get("ADMISSION_ENABLED", True):
+            app.before_request(self.before_request)
+            app.teardown_request(self.teardown_request)
+
+    def limit(self, endpoint, method, **options):
+        self.rules[(endpoint, method.upper())] = Rule(endpoint, method.upper(), **options)
+
+    def stats(self):
+        return [rule.stats() for rule in self.rules.values()]
+
+    def rate_limited(self, endpoint, method):
+        rule = self.rules.get((endpoint, method.upper()))
+        return rule is not None and rule.bucket is not None
+
+    def before_request(self):
+        rule = self.rules.get((request.endpoint, request.method))
+        if rule is None:
+            return None
+
+        # Imported lazily, app.resources pulls in the models
+        from app.resources import error_response
+
+        if rule.bucket is not None:
+            allowed, wait = rule.bucket.try_acquire()
+            if not allowed:
+                rule.rate_limited += 1
+                body, status = error_response(
+                    "rate_limited", "Too many requests, slow down.", status_code=429
+                )
+                return body, status, {"Retry-After": str(max(1, math.ceil(wait)))}
+
+        if rule.limiter is not None:
+            if not rule.limiter.acquire():
+                rule.shed += 1
+                body, status = error_response(
+                    "server_overloaded", "Server is busy, try again shortly.", status_code=503
+                )
+                return body, status, {"Retry-After": str(rule.retry_after)}
+            request.environ[ENVIRON_KEY] = rule.limiter
+
+        rule.admitted += 1
+        return None
+
+    def teardown_request(self, exc=None):
+        # Stored on the environ rather than `g`: batch sub-requests share
+        # the app context and must not release the outer request's slot.
+        limiter = request.environ.pop(ENVIRON_KEY, None)
+        if limiter is not None:
+            limiter.release()
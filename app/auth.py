@@ -0,0 +1,98 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from flask import request, current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+ENVIRON_KEY = "taskpro.auth"
+SALT = "taskpro-auth"
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class TokenAuth:
+    """
+    Short-lived bearer tokens signed with SECRET_KEY. The password hash is
+    checked once at login; afterwards a request is authenticated by an HMAC
+    check (constant-time compare in itsdangerous) and a revocation lookup,
+    without touching the database.
+
+    Revocations live in process memory for at most the token lifetime, so
+    logout is best-effort: under the pre-fork server only the worker that
+    handled POST /auth/logout rejects the token, the others accept it until
+    it expires. Keep AUTH_TOKEN_MAX_AGE short; a shared store would put a
+    lookup back on every request. When the cache is full the oldest
+    revocation is dropped first, so size it above the number of logouts
+    expected within AUTH_TOKEN_MAX_AGE.
+    """
+
+    def __init__(self, app=None):
+        self.revoked = OrderedDict()
+        self.lock = threading.Lock()
+        self.max_age = 300
+        self.max_revoked = 10000
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.serializer = URLSafeTimedSerializer(app.config["SECRET_KEY"], salt=SALT)
+        self.max_age = app.config.get("AUTH_TOKEN_MAX_AGE", self.max_age)
+        self.max_revoked = app.config.get("AUTH_REVOCATION_CACHE_SIZE", self.max_revoked)
+        app.extensions["auth"] = self
+
+    def issue(self, user_id):
+        # The jti makes tokens issued within the same second distinct, so
+        # revoking one doesn't revoke its siblings
+        return self.serializer.dumps({"uid": user_id, "jti": secrets.token_urlsafe(12)})
+
+    def verify(self, token):
+        """Returns the token payload, raises InvalidToken if forged, expired or revoked."""
+        try:
+            payload, issued = self.serializer.loads(token, max_age=self.max_age, return_timestamp=True)
+        except BadSignature:
+            raise InvalidToken("Token is invalid or has expired.")
+        if not isinstance(payload, dict) or not isinstance(payload.get("uid"), int):
+            raise InvalidToken("Token is invalid or has expired.")
+        with self.lock:
+            if payload["jti"] in self.revoked:
+                raise InvalidToken("Token has been revoked.")
+        payload["exp"] = issued.timestamp() + self.max_age
+        return payload
+
+    def revoke(self, payload):
+        now = time.time()
+        with self.lock:
+            # Entries expire in roughly insertion order, expired ones sit at the front
+            while self.revoked and next(iter(self.revoked.values())) <= now:
+                self.revoked.popitem(last=False)
+            self.revoked[payload["jti"]] = payload["exp"]
+            while len(self.revoked) > self.max_revoked:
+                self.revoked.popitem(last=False)
+
+
+def bearer_token():
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" and token.strip() else None
+
+
+def current_token():
+    """
+    The verified payload of the request's bearer token, or None without one.
+    Cached on the environ: batch sub-requests carry their own copy of the
+    Authorization header and are verified separately.
+    """
+    if ENVIRON_KEY not in request.environ:
+        token = bearer_token()
+        try:
+            payload = current_app.extensions["auth"].verify(token) if token else None
+        except InvalidToken as e:
+            payload = e
+        request.environ[ENVIRON_KEY] = payload
+
+    payload = request.environ[ENVIRON_KEY]
+    if isinstance(payload, InvalidToken):
+        raise payload
+    return payload
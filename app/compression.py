@@ -0,0 +1,125 @@
+import zlib
+from flask import request, current_app
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip/deflate always work
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/problem+json", "application/msgpack", "text/plain", "text/html"
+}
+CHUNK_SIZE = 64 * 1024
+
+
+def _gzip_compressor(level):
+    # wbits=16+MAX_WBITS makes zlib emit a gzip header/trailer
+    return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def _deflate_compressor(level):
+    # HTTP "deflate" is the zlib-wrapped stream, not raw deflate
+    return zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS)
+
+
+def _zstd_compressor(level):
+    return zstandard.ZstdCompressor(level=level).compressobj()
+
+
+CODECS = {
+    "zstd": _zstd_compressor,
+    "gzip": _gzip_compressor,
+    "deflate": _deflate_compressor,
+}
+
+
+def _compress_stream(chunks, compressor):
+    """Compresses an iterable of byte chunks one at a time."""
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _slices(body, size=CHUNK_SIZE):
+    view = memoryview(body)
+    for start in range(0, len(view), size):
+        yield view[start:start + size]
+
+
+class Compress:
+    """
+    Negotiated response compression (zstd/gzip/deflate).
+    Small bodies are sent as-is, large or streamed bodies are compressed
+    chunk by chunk so the full compressed copy is never held in memory.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESSION_ENABLED", True)
+        app.config.setdefault("COMPRESSION_ALGORITHMS", ("zstd", "gzip", "deflate"))
+        app.config.setdefault("COMPRESSION_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESSION_LEVEL", 6)
+        app.config.setdefault("COMPRESSION_STREAM_THRESHOLD", 1024 * 1024)
+
+        if app.config["COMPRESSION_ENABLED"]:
+            app.after_request(self.after_request)
+
+    def choose_encoding(self, algorithms):
+        """Picks the best algorithm the client accepts, honouring q-values."""
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for name in algorithms:
+            if name == "zstd" and zstandard is None:
+                continue
+            quality = accepted[name]
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    def after_request(self, response):
+        config = current_app.config
+
+        if (
+            response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return response
+
+        streamed = response.is_streamed
+        if not streamed and response.content_length is not None \
+                and response.content_length < config["COMPRESSION_MIN_SIZE"]:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self.choose_encoding(config["COMPRESSION_ALGORITHMS"])
+        if encoding is None:
+            return response
+
+        compressor = CODECS[encoding](config["COMPRESSION_LEVEL"])
+
+        if streamed:
+            response.response = _compress_stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) >= config["COMPRESSION_STREAM_THRESHOLD"]:
+                # Large bodies: emit compressed chunks lazily instead of
+                # building a second full-size buffer next to the original.
+                response.response = _compress_stream(_slices(body), compressor)
+                response.headers.pop("Content-Length", None)
+            else:
+                response.set_data(compressor.compress(body) + compressor.flush())
+
+        response.headers["Content-Encoding"] = encoding
+        return response
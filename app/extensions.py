@@ -1,10 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
-from flask_migrate import Migrate
-from flask_restful import Api
+from app.compression import Compress
+from app.sharding import ShardedSession
 
-# We instantiate these without an 'app' object
-db = SQLAlchemy()
+# We instantiate these without an 'app' object.
+# Flask-Migrate is not created here: importing it pulls in Alembic, which
+# only `flask db ...` needs (see init_migrate in app/__init__.py).
+# The Flask-RESTful Api is built per app in create_app.
+db = SQLAlchemy(session_options={"class_": ShardedSession})
 ma = Marshmallow()
-migrate = Migrate()
-api = Api()
+compress = Compress()
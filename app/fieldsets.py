@@ -0,0 +1,74 @@
+from functools import lru_cache
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+
+class FieldsetError(ValueError):
+    """Raised when ?fields= names a field the schema does not expose."""
+
+    def __init__(self, fields):
+        super().__init__(f"Unknown fields: {', '.join(fields)}")
+        self.fields = fields
+
+
+@lru_cache(maxsize=None)
+def dump_field_names(schema_cls):
+    return frozenset(schema_cls().dump_fields)
+
+
+@lru_cache(maxsize=256)
+def schema_for(schema_cls, only=None):
+    """Schema instances are cached per fieldset, building them is not free."""
+    return schema_cls(only=only) if only else schema_cls()
+
+
+def requested_fields(schema_cls):
+    """
+    Parses ?fields=id,name,deadline into a sorted tuple of field names.
+    Returns None when the parameter is missing, meaning "everything".
+    """
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+
+    names = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = names - dump_field_names(schema_cls)
+    if unknown:
+        raise FieldsetError(sorted(unknown))
+    return tuple(sorted(names))
+
+
+@lru_cache(maxsize=256)
+def column_keys(schema_cls, only=None):
+    """
+    Column attributes behind the requested fields (all dumped ones for None).
+    The primary key and foreign keys are always included since the HATEOAS
+    links are built from them.
+    """
+    mapper = inspect(schema_cls.Meta.model)
+    dumped = dump_field_names(schema_cls)
+    return tuple(
+        attr.key for attr in mapper.column_attrs
+        if (attr.key in (only or dumped)) or attr.columns[0].primary_key or attr.columns[0].foreign_keys
+    )
+
+
+def load_options(schema_cls, only):
+    """Builds loader options so only the columns behind the requested fields are SELECTed."""
+    if not only:
+        return []
+
+    model = schema_cls.Meta.model
+    mapper = inspect(model)
+    options = [load_only(*(getattr(model, key) for key in column_keys(schema_cls, only)))]
+
+    # Relationships dumped through a Nested field are batch loaded with the
+    # nested schema's own `only` applied to the related table.
+    for rel in mapper.relationships:
+        if rel.key in only:
+            nested = schema_for(schema_cls).fields[rel.key]
+            nested_only = tuple(sorted(nested.only)) if nested.only else None
+            loader = selectinload(getattr(model, rel.key))
+            options.append(loader.options(*load_options(type(nested.schema), nested_only)))
+    return options
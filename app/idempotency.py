@@ -0,0 +1,135 @@
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import request, current_app
+from flask_restful.utils import unpack
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import IdempotencyKey
+
+keys = IdempotencyKey.__table__
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _scope_hash(scope):
+    return hashlib.sha256("\n".join(scope).encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    TTL-evicted map of Idempotency-Key -> stored response, kept in the
+    `idempotency_keys` table of the default database so that every worker
+    of a pre-fork server sees the same keys. Each call uses its own short
+    transaction, independent of the request's session.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 24 * 3600
+        self.pending_timeout = 60
+        self.sweep_interval = 60
+        self.last_sweep = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("IDEMPOTENCY_TTL", self.ttl)
+        self.pending_timeout = app.config.get("IDEMPOTENCY_PENDING_TIMEOUT", self.pending_timeout)
+        app.extensions["idempotency"] = self
+
+    def _sweep(self, conn, now):
+        # Expired keys are deleted in bulk now and then, not on every request
+        if time.monotonic() - self.last_sweep >= self.sweep_interval:
+            self.last_sweep = time.monotonic()
+            conn.execute(delete(keys).where(keys.c.expires_at <= now))
+
+    def begin(self, scope, fingerprint):
+        """Returns ("new" | "replay" | "in_progress" | "mismatch", (data, status) for replays)."""
+        key_hash, now = _scope_hash(scope), _now()
+        stale_pending = now - timedelta(seconds=self.pending_timeout)
+        for _ in range(2):
+            try:
+                with db.engine.begin() as conn:
+                    self._sweep(conn, now)
+                    row = conn.execute(select(keys).where(keys.c.key_hash == key_hash)).first()
+                    # Expired keys, and pending ones whose worker died, are up for grabs
+                    if row is None or row.expires_at <= now or (row.status_code is None and row.created_at <= stale_pending):
+                        if row is not None:
+                            conn.execute(delete(keys).where(keys.c.key_hash == key_hash))
+                        conn.execute(insert(keys).values(
+                            key_hash=key_hash, fingerprint=fingerprint, created_at=now,
+                            expires_at=now + timedelta(seconds=self.ttl),
+                        ))
+                        return "new", None
+                    if row.fingerprint != fingerprint:
+                        return "mismatch", None
+                    if row.status_code is None:
+                        return "in_progress", None
+                    return "replay", (row.response, row.status_code)
+            except IntegrityError:
+                continue  # another worker claimed the key in between, look again
+        return "in_progress", None
+
+    def finish(self, scope, data, status):
+        with db.engine.begin() as conn:
+            conn.execute(update(keys).where(keys.c.key_hash == _scope_hash(scope))
+                         .values(response=data, status_code=status))
+
+    def abort(self, scope):
+        with db.engine.begin() as conn:
+            conn.execute(delete(keys).where(keys.c.key_hash == _scope_hash(scope)))
+
+
+def idempotent(method):
+    """
+    Honours an Idempotency-Key header on a resource method. The first
+    response (unless it is a 5xx) is stored and replayed for retries that
+    carry the same key and payload, without running the handler again.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if key is None:
+            return method(*args, **kwargs)
+
+        # Imported lazily, app.resources imports this module
+        from app.resources import error_response
+
+        if not key or len(key) > 255:
+            return error_response("invalid_idempotency_key", "Idempotency-Key must be 1-255 characters.", status_code=400)
+
+        store = current_app.extensions["idempotency"]
+        scope = (request.method, request.path, key)
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+        state, stored = store.begin(scope, fingerprint)
+        if state == "replay":
+            data, status = stored
+            return data, status, {"Idempotent-Replayed": "true"}
+        if state == "in_progress":
+            return error_response(
+                "request_in_progress", "A request with this Idempotency-Key is still being processed.", status_code=409
+            )
+        if state == "mismatch":
+            return error_response(
+                "idempotency_key_reused", "Idempotency-Key was already used with a different payload.", status_code=422
+            )
+
+        try:
+            resp = method(*args, **kwargs)
+        except Exception:
+            store.abort(scope)
+            raise
+
+        data, status, _ = unpack(resp)
+        if status >= 500:
+            # Server errors are not final, let the client retry for real
+            store.abort(scope)
+        else:
+            store.finish(scope, data, status)
+        return resp
+    return wrapper
@@ -0,0 +1,302 @@
+"""
+Background jobs backed by the `jobs` table, without an external broker.
+
+Requests enqueue a job and answer 202 Accepted; `flask jobs work` runs a
+worker that claims due jobs, reports progress and retries failures with
+exponential backoff. Queue bookkeeping uses its own short transactions on
+the default engine, so it never mixes with the handler's session (which
+may be routed to a user shard).
+"""
+import os
+import random
+import signal
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import and_, delete, insert, or_, select, update
+from app.extensions import db
+from app.models import Job, Task, User, record_task_changes
+from app.schemas import TaskSchema, TaskChangesSchema, TaskFilterSchema
+from app.sharding import use_shard, shard_for_user
+
+jobs = Job.__table__
+
+# kind -> handler(context, payload)
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (e.g. the user is gone)."""
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobQueue:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_attempts = app.config.get("JOB_MAX_ATTEMPTS", 5)
+        self.backoff_base = app.config.get("JOB_BACKOFF_BASE", 2.0)
+        self.backoff_max = app.config.get("JOB_BACKOFF_MAX", 300.0)
+        self.lock_timeout = app.config.get("JOB_LOCK_TIMEOUT", 600)
+        self.poll_interval = app.config.get("JOB_POLL_INTERVAL", 1.0)
+        self.chunk_size = app.config.get("JOB_CHUNK_SIZE", 500)
+        app.extensions["jobs"] = self
+        app.cli.add_command(jobs_cli)
+
+    # region queue
+
+    def enqueue(self, kind, payload, user_id=None):
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        with db.engine.begin() as conn:
+            return conn.execute(insert(jobs).values(
+                kind=kind, user_id=user_id, payload=payload,
+                max_attempts=self.max_attempts, run_after=_now(),
+            )).inserted_primary_key[0]
+
+    def get(self, job_id):
+        with db.engine.connect() as conn:
+            return conn.execute(select(jobs).where(jobs.c.id == job_id)).first()
+
+    def _claimable(self, now):
+        # Running jobs whose lock is older than JOB_LOCK_TIMEOUT belong to a
+        # worker that died; they are picked up again like queued ones.
+        stale = now - timedelta(seconds=self.lock_timeout)
+        return or_(
+            and_(jobs.c.status == "queued", jobs.c.run_after <= now),
+            and_(jobs.c.status == "running", jobs.c.locked_at < stale, jobs.c.attempts < jobs.c.max_attempts),
+        )
+
+    def claim(self, worker_id):
+        """Marks the next due job as running for `worker_id` and returns it, or None."""
+        now = _now()
+        with db.engine.begin() as conn:
+            while True:
+                # SKIP LOCKED lets PostgreSQL workers pass each other; the
+                # conditional UPDATE below is what makes the claim safe everywhere.
+                job_id = conn.execute(
+                    select(jobs.c.id).where(self._claimable(now))
+                    .order_by(jobs.c.run_after, jobs.c.id).limit(1)
+                    .with_for_update(skip_locked=True)
+                ).scalar()
+                if job_id is None:
+                    return None
+
+                claimed = conn.execute(
+                    update(jobs).where(jobs.c.id == job_id, self._claimable(now))
+                    .values(status="running", locked_by=worker_id, locked_at=now, attempts=jobs.c.attempts + 1)
+                ).rowcount
+                if claimed:
+                    return conn.execute(select(jobs).where(jobs.c.id == job_id)).first()
+
+    def fail_abandoned(self):
+        """Fails jobs whose worker died on their last attempt."""
+        stale = _now() - timedelta(seconds=self.lock_timeout)
+        with db.engine.begin() as conn:
+            return conn.execute(
+                update(jobs).where(jobs.c.status == "running", jobs.c.locked_at < stale,
+                                   jobs.c.attempts >= jobs.c.max_attempts)
+                .values(status="failed", error="Worker stopped responding.", finished_at=_now(), locked_by=None)
+            ).rowcount
+
+    def _finish(self, job_id, **values):
+        with db.engine.begin() as conn:
+            conn.execute(update(jobs).where(jobs.c.id == job_id).values(locked_by=None, **values))
+
+    def backoff(self, attempts):
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)  # jitter keeps retries from lining up
+
+    def run(self, job):
+        """Runs a claimed job and records its outcome."""
+        handler = HANDLERS.get(job.kind)
+        context = JobContext(self, job)
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler for job kind '{job.kind}'.")
+            with use_shard(shard_for_user(job.user_id) if job.user_id is not None else None):
+                result = handler(context, job.payload)
+        except Exception as e:
+            db.session.rollback()
+            permanent = isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts
+            current_app.logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed: {str(e)}")
+            if permanent:
+                self._finish(job.id, status="failed", error=str(e), finished_at=_now())
+            else:
+                retry_at = _now() + timedelta(seconds=self.backoff(job.attempts))
+                self._finish(job.id, status="queued", error=str(e), run_after=retry_at)
+            return False
+        finally:
+            db.session.remove()
+
+        self._finish(job.id, status="succeeded", result=result, error=None, finished_at=_now())
+        return True
+
+    # endregion
+
+
+class JobContext:
+    """Handed to job handlers for progress reporting."""
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.job = job
+        self.chunk_size = queue.chunk_size
+
+    def progress(self, done, total=None):
+        values = {"progress_done": done}
+        if total is not None:
+            values["progress_total"] = total
+        with db.engine.begin() as conn:
+            conn.execute(update(jobs).where(jobs.c.id == self.job.id).values(**values))
+
+
+class Worker:
+    def __init__(self, queue, worker_id=None):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+
+    def handle_stop(self, signum, frame):
+        # The current job runs to completion, no new one is claimed
+        self.stopping = True
+
+    def run(self, burst=False):
+        """Processes jobs until stopped; with `burst`, until the queue is empty. Returns the count."""
+        processed = 0
+        while not self.stopping:
+            self.queue.fail_abandoned()
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                if burst:
+                    break
+                time.sleep(self.queue.poll_interval)
+                continue
+            self.queue.run(job)
+            processed += 1
+        return processed
+
+
+# region handlers
+
+def _require_user(user_id):
+    if db.session.get(User, user_id) is None:
+        raise PermanentJobError(f"User {user_id} does not exist.")
+
+
+@job_handler("export_tasks")
+def export_tasks(context, payload):
+    user_id = payload["user_id"]
+    _require_user(user_id)
+    # No links: the worker has no request to build URLs from
+    schema = TaskSchema(exclude=("links", "owner"))
+
+    total = db.session.query(Task.id).filter(Task.user_id == user_id).count()
+    context.progress(0, total)
+    exported, last_id = [], 0
+    while True:
+        chunk = db.session.execute(
+            select(Task).where(Task.user_id == user_id, Task.id > last_id).order_by(Task.id).limit(context.chunk_size)
+        ).scalars().all()
+        if not chunk:
+            break
+        exported.extend(schema.dump(chunk, many=True))
+        last_id = chunk[-1].id
+        db.session.expunge_all()
+        context.progress(len(exported))
+    return {"count": len(exported), "tasks": exported}
+
+
+@job_handler("purge_user")
+def purge_user(context, payload):
+    """Deletes a user's tasks chunk by chunk, then the user. Safe to re-run."""
+    user_id = payload["user_id"]
+    if db.session.get(User, user_id) is None:
+        return {"deleted_tasks": 0}  # finished by an earlier attempt
+
+    total = db.session.query(Task.id).filter(Task.user_id == user_id).count()
+    context.progress(0, total)
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            select(Task.id).where(Task.user_id == user_id).limit(context.chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(delete(Task).where(Task.id.in_(ids)))
+        record_task_changes(db.session.connection(), [(user_id, tid) for tid in ids], "delete")
+        db.session.commit()
+        deleted += len(ids)
+        context.progress(deleted)
+
+    db.session.execute(delete(User).where(User.id == user_id))
+    db.session.commit()
+    return {"deleted_tasks": deleted}
+
+
+@job_handler("bulk_update_tasks")
+def bulk_update_tasks(context, payload):
+    """The asynchronous form of PATCH /users/<id>/tasks with a filter."""
+    user_id = payload["user_id"]
+    _require_user(user_id)
+    try:
+        criteria = TaskFilterSchema().load(payload.get("filter") or {})
+        changes = TaskChangesSchema(partial=True).load(payload["changes"])
+    except ValidationError as err:
+        raise PermanentJobError(f"Invalid bulk update: {err.messages}")
+
+    conditions = [Task.user_id == user_id]
+    if "ids" in criteria:
+        conditions.append(Task.id.in_(criteria["ids"]))
+    if "priority" in criteria:
+        conditions.append(Task.priority == criteria["priority"])
+    if "deadline_before" in criteria:
+        conditions.append(Task.deadline < criteria["deadline_before"])
+    if "deadline_after" in criteria:
+        conditions.append(Task.deadline > criteria["deadline_after"])
+
+    # Matching ids are fixed up front so that an update which changes the
+    # filtered column (e.g. priority) can't make the scan skip or repeat rows
+    ids = db.session.execute(select(Task.id).where(*conditions).order_by(Task.id)).scalars().all()
+    context.progress(0, len(ids))
+    for start in range(0, len(ids), context.chunk_size):
+        chunk = ids[start:start + context.chunk_size]
+        db.session.execute(update(Task).where(Task.id.in_(chunk), Task.user_id == user_id).values(**changes))
+        record_task_changes(db.session.connection(), [(user_id, tid) for tid in chunk], "upsert")
+        db.session.commit()
+        context.progress(start + len(chunk))
+    return {"updated": len(ids)}
+
+# endregion
+
+
+@click.group("jobs")
+def jobs_cli():
+    """Run background jobs."""
+
+
+@jobs_cli.command("work")
+@click.option("--burst", is_flag=True, help="Exit once the queue is empty.")
+def work_command(burst):
+    """Process queued jobs until stopped (SIGTERM finishes the current job first)."""
+    worker = Worker(current_app.extensions["jobs"])
+    signal.signal(signal.SIGTERM, worker.handle_stop)
+    signal.signal(signal.SIGINT, worker.handle_stop)
+    current_app.logger.info(f"Job worker {worker.worker_id} started")
+    processed = worker.run(burst=burst)
+    click.echo(f"Processed {processed} jobs.")
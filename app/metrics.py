@@ -0,0 +1,249 @@
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from flask import request, current_app, Response
+from app.sharding import all_engines
+
+ENVIRON_KEY = "taskpro.metrics.start"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# name -> (type, help)
+DEFINITIONS = {
+    "taskpro_http_requests_total": ("counter", "HTTP requests by endpoint, method and status."),
+    "taskpro_http_request_duration_seconds": ("histogram", "Request latency by endpoint and method."),
+    "taskpro_bulk_operation_size": ("histogram", "Number of items in bulk and batch operations."),
+    "taskpro_db_pool_size": ("gauge", "Configured size of the DB connection pool."),
+    "taskpro_db_pool_checked_out": ("gauge", "DB connections currently in use."),
+    "taskpro_db_pool_overflow": ("gauge", "DB connections opened beyond the pool size."),
+}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms. With METRICS_DIR set, every process
+    periodically writes a snapshot to <dir>/metrics-<pid>-<uuid>.json and
+    /metrics sums the snapshots of all processes, so any worker can answer
+    a scrape. Files of exited workers are kept (their counters still count);
+    the uuid stops a new worker that reuses a pid from overwriting them.
+    """
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = 0.0
+        self.owner_pid = None
+        self.snapshot_path = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get("METRICS_DIR")
+        self.flush_interval = app.config.get("METRICS_FLUSH_INTERVAL", 1.0)
+        app.extensions["metrics"] = self
+
+        if app.config.get("METRICS_ENABLED", True):
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+            app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    # region collection
+
+    def inc(self, name, labels, value=1):
+        key = (name, _key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        key = (name, _key(labels))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {"buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(hist["buckets"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+                    break
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def before_request(self):
+        request.environ[ENVIRON_KEY] = time.perf_counter()
+
+    def after_request(self, response):
+        start = request.environ.pop(ENVIRON_KEY, None)
+        if start is None or request.endpoint == "metrics":
+            return response
+
+        endpoint = request.endpoint or "unknown"
+        self.inc("taskpro_http_requests_total",
+                 {"endpoint": endpoint, "method": request.method, "status": str(response.status_code)})
+        self.observe("taskpro_http_request_duration_seconds",
+                     {"endpoint": endpoint, "method": request.method}, time.perf_counter() - start, LATENCY_BUCKETS)
+
+        if self.directory and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush(min_interval=self.flush_interval)
+        return response
+
+    # endregion
+
+    # region multi-process storage
+
+    def pool_gauges(self):
+        gauges = {}
+        for bind, engine in all_engines().items():
+            pool = engine.pool
+            if not hasattr(pool, "checkedout"):
+                continue  # e.g. StaticPool for in-memory SQLite
+            labels = _key({"bind": bind})
+            gauges[("taskpro_db_pool_size", labels)] = pool.size()
+            gauges[("taskpro_db_pool_checked_out", labels)] = pool.checkedout()
+            gauges[("taskpro_db_pool_overflow", labels)] = max(pool.overflow(), 0)
+        return gauges
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[name, labels, value] for (name, labels), value in self.counters.items()],
+                "histograms": [[name, labels, dict(h, counts=list(h["counts"]))]
+                               for (name, labels), h in self.histograms.items()],
+                "gauges": [[name, labels, value] for (name, labels), value in self.pool_gauges().items()],
+            }
+
+    def own_snapshot_path(self):
+        # Workers are forked from the master: a new pid means a new file
+        if self.owner_pid != os.getpid():
+            self.owner_pid = os.getpid()
+            self.snapshot_path = os.path.join(self.directory, f"metrics-{self.owner_pid}-{uuid.uuid4().hex}.json")
+        return self.snapshot_path
+
+    def flush(self, min_interval=0.0):
+        # Request threads and /metrics scrapes flush concurrently and share the
+        # temp file, so one flush at a time; the interval is re-checked under
+        # the lock so that only one of the waiting threads writes per interval
+        with self.flush_lock:
+            now = time.monotonic()
+            if now - self.last_flush < min_interval:
+                return
+            self.last_flush = now
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.own_snapshot_path()
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp, path)  # atomic, readers never see half a file
+
+    def close(self):
+        """Final flush when a worker exits, so increments since the last one aren't lost."""
+        if self.directory:
+            self.flush()
+
+    def reset_storage(self):
+        """Called once by the master before forking so old runs don't add up."""
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+                os.remove(path)
+
+    def collect(self):
+        if self.directory:
+            self.flush()
+        snapshots = [self.snapshot()]
+        if self.directory:
+            own_path = self.own_snapshot_path()
+            for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+                if path == own_path:
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+
+        counters, histograms, gauges = {}, {}, {}
+        for snap in snapshots:
+            for name, labels, value in snap["counters"]:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, hist in snap["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, dict(hist, counts=[0] * len(hist["counts"]), sum=0.0, count=0))
+                merged["counts"] = [a + b for a, b in zip(merged["counts"], hist["counts"])]
+                merged["sum"] += hist["sum"]
+                merged["count"] += hist["count"]
+            # Gauges describe live state: skip processes that have exited
+            if snap["pid"] == os.getpid() or _alive(snap["pid"]):
+                for name, labels, value in snap["gauges"]:
+                    key = (name, tuple(map(tuple, labels)))
+                    gauges[key] = gauges.get(key, 0) + value
+        return counters, histograms, gauges
+
+    # endregion
+
+    def render(self):
+        counters, histograms, gauges = self.collect()
+        samples = {}
+        for (name, labels), value in sorted(counters.items()) + sorted(gauges.items()):
+            samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), hist in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(hist["buckets"], hist["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(hist['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {hist['count']}")
+
+        out = []
+        for name, (kind, help_text) in DEFINITIONS.items():
+            if name in samples:
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} {kind}")
+                out.extend(samples[name])
+        return "\n".join(out) + "\n"
+
+    def metrics_view(self):
+        return Response(self.render(), content_type=CONTENT_TYPE)
+
+
+def observe_bulk(operation, size):
+    """Records the size of a bulk/batch operation, no-op without the registry."""
+    metrics = current_app.extensions.get("metrics")
+    if metrics is not None:
+        metrics.observe("taskpro_bulk_operation_size", {"operation": operation}, size, SIZE_BUCKETS)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import CheckConstraint, func
+from sqlalchemy import CheckConstraint, event, func, insert, text
+from sqlalchemy.orm import object_session
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.extensions import db
+from app.sharding import assign_sharded_id
 
 
 class User(db.Model):
@@ -55,7 +57,8 @@ class Task(db.Model):
     user_id = db.Column(
         db.Integer, 
         db.ForeignKey('users.id', ondelete="CASCADE"), 
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # Note: 'owner' is automatically created by the backref in User.
@@ -65,6 +68,127 @@ class Task(db.Model):
     )
 
 
+class TaskChange(db.Model):
+    """
+    Append-only change feed for delta sync. Every task write gets a new,
+    increasing `seq`; deletions are kept as tombstones (op="delete").
+
+    Readers page with `seq > since`, so a user's changes must become
+    visible in seq order. `seq` is assigned at INSERT, not at COMMIT, so
+    writers to the same user's feed are serialized until commit (see
+    lock_change_feed). SQLite already allows a single writer at a time.
+    """
+    __tablename__ = 'task_changes'
+
+    seq = db.Column(db.Integer, primary_key=True)
+    # No foreign keys: tombstones must outlive the task (and its owner)
+    user_id = db.Column(db.Integer, nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # "upsert" or "delete"
+    changed_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_task_changes_user_seq', 'user_id', 'seq'),
+    )
+
+
+class IdempotencyKey(db.Model):
+    """Stored responses for Idempotency-Key retries (see app/idempotency.py)."""
+    __tablename__ = 'idempotency_keys'
+
+    # sha256 of method, path and key
+    key_hash = db.Column(db.String(64), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of the request body
+    status_code = db.Column(db.Integer)  # NULL while the first request is running
+    response = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class Job(db.Model):
+    """
+    A unit of background work (see app/jobs.py). Rows are claimed by
+    workers with a conditional UPDATE, so the table is the queue.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    user_id = db.Column(db.Integer)  # owner of the affected data, if any
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued/running/succeeded/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False)
+    run_after = db.Column(db.DateTime, nullable=False)  # not claimable before this (retry backoff)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)
+
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+
+# First key of the two-key advisory locks guarding the change feed
+CHANGE_FEED_LOCK = 0x7461736b
+
+
+def lock_change_feed(connection, user_ids):
+    """
+    Takes a transaction-scoped advisory lock per user on PostgreSQL. A
+    second writer for the same user waits before drawing its seq, so it
+    can't commit a higher seq while a lower one is still in flight (which
+    a reader would skip forever). Locks are taken in id order to avoid
+    deadlocks between bulk writers.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for user_id in sorted(set(user_ids)):
+        connection.execute(text("SELECT pg_advisory_xact_lock(:ns, :user_id)"),
+                           {"ns": CHANGE_FEED_LOCK, "user_id": user_id})
+
+
+def record_task_changes(connection, pairs, op):
+    """
+    Appends one change per (user_id, task_id) pair. Used directly by
+    set-based statements, which bypass the ORM events below.
+    """
+    rows = [{"user_id": user_id, "task_id": task_id, "op": op} for user_id, task_id in pairs]
+    if rows:
+        lock_change_feed(connection, [row["user_id"] for row in rows])
+        connection.execute(insert(TaskChange), rows)
+
+
+# Sharded deployments allocate user and task ids per shard
+event.listen(User, "before_insert", assign_sharded_id)
+event.listen(Task, "before_insert", assign_sharded_id)
+
+
+@event.listens_for(Task, "after_insert")
+def task_inserted(mapper, connection, target):
+    record_task_changes(connection, [(target.user_id, target.id)], "upsert")
+
+
+@event.listens_for(Task, "after_update")
+def task_updated(mapper, connection, target):
+    # after_update also fires for objects without net changes
+    if object_session(target).is_modified(target, include_collections=False):
+        record_task_changes(connection, [(target.user_id, target.id)], "upsert")
+
+
+@event.listens_for(Task, "after_delete")
+def task_deleted(mapper, connection, target):
+    record_task_changes(connection, [(target.user_id, target.id)], "delete")
+
+
 """
 default=...: This is handled by SQLAlchemy in the python code—not a db feature.
 server_default=...: This is written into the SQL schema—db feature.
@@ -0,0 +1,128 @@
+"""
+Helpers for migrating large tables without long locks.
+
+Use them from scripts in migrations/versions/:
+
+    from app.online_migrations import create_index_concurrently, backfill
+
+    def upgrade():
+        create_index_concurrently('ix_tasks_user_id', 'tasks', ['user_id'])
+        backfill('tasks', {'priority': 1}, where='priority IS NULL')
+
+On PostgreSQL indexes are built with CREATE INDEX CONCURRENTLY outside the
+migration transaction and backfills commit chunk by chunk. Other databases
+(SQLite in tests) get the plain, transactional equivalent.
+"""
+import logging
+import time
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("alembic.online")
+
+checkpoints = sa.Table(
+    "online_migration_checkpoints", sa.MetaData(),
+    sa.Column("name", sa.String(200), primary_key=True),
+    sa.Column("last_key", sa.BigInteger, nullable=False),
+    sa.Column("updated_at", sa.DateTime, server_default=sa.func.current_timestamp(), nullable=False),
+)
+
+
+def is_postgres(bind=None):
+    return (bind or op.get_bind()).dialect.name == "postgresql"
+
+
+def set_lock_timeout(connection, timeout_ms):
+    """
+    Makes DDL give up instead of queueing behind long transactions (and
+    blocking every query queued behind it). Called from migrations/env.py.
+    """
+    if timeout_ms and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET lock_timeout = {int(timeout_ms)}")
+
+
+def create_index_concurrently(index_name, table_name, columns, unique=False, **kw):
+    if not is_postgres():
+        op.create_index(index_name, table_name, columns, unique=unique, **kw)
+        return
+
+    # CONCURRENTLY is not allowed inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            index_name, table_name, columns, unique=unique,
+            postgresql_concurrently=True, if_not_exists=True, **kw
+        )
+
+
+def drop_index_concurrently(index_name, table_name, **kw):
+    if not is_postgres():
+        op.drop_index(index_name, table_name=table_name, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True, **kw)
+
+
+def chunked_backfill(connection, table_name, values, where=None, key="id", batch_size=1000,
+                     sleep=0.0, name=None, progress=None):
+    """
+    Runs `UPDATE table SET values WHERE where` in primary key ranges of
+    `batch_size`, committing after each one so locks are held briefly.
+
+    The last finished key is checkpointed under `name` (defaults to the
+    table and columns), so an interrupted backfill resumes where it
+    stopped. `sleep` throttles between chunks; `progress(done_key, max_key,
+    rows)` is called after every chunk. Returns the number of rows updated.
+    """
+    name = name or f"backfill:{table_name}:{','.join(sorted(values))}"
+    table = sa.table(table_name, sa.column(key), *(sa.column(col) for col in values))
+    pk = table.c[key]
+    autocommit = connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+    def commit():
+        if not autocommit:
+            connection.commit()
+
+    checkpoints.create(connection, checkfirst=True)
+    last_key = connection.execute(
+        sa.select(checkpoints.c.last_key).where(checkpoints.c.name == name)
+    ).scalar()
+    if last_key is None:
+        last_key = connection.execute(sa.select(sa.func.min(pk))).scalar()
+        last_key = (last_key or 1) - 1
+        connection.execute(checkpoints.insert().values(name=name, last_key=last_key))
+    else:
+        logger.info(f"{name}: resuming after {key}={last_key}")
+
+    max_key = connection.execute(sa.select(sa.func.max(pk))).scalar() or 0
+    commit()
+
+    total = 0
+    while last_key < max_key:
+        upper = min(last_key + batch_size, max_key)
+        stmt = sa.update(table).where(pk > last_key, pk <= upper).values(**values)
+        if where is not None:
+            stmt = stmt.where(sa.text(where) if isinstance(where, str) else where)
+
+        total += connection.execute(stmt).rowcount
+        connection.execute(
+            checkpoints.update().where(checkpoints.c.name == name).values(last_key=upper)
+        )
+        commit()
+        last_key = upper
+
+        logger.info(f"{name}: {key} {upper}/{max_key} ({upper * 100 // max_key}%), {total} rows updated")
+        if progress is not None:
+            progress(upper, max_key, total)
+        if sleep:
+            time.sleep(sleep)
+
+    connection.execute(checkpoints.delete().where(checkpoints.c.name == name))
+    commit()
+    return total
+
+
+def backfill(table_name, values, where=None, **kw):
+    """chunked_backfill for migration scripts, run outside the migration transaction."""
+    with op.get_context().autocommit_block():
+        return chunked_backfill(op.get_bind(), table_name, values, where=where, **kw)
@@ -0,0 +1,93 @@
+import cProfile
+import hmac
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from flask import request
+
+ENVIRON_KEY = "taskpro.profiler"
+PROFILE_HEADER = "X-Profile"
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile hook. A request is profiled when it is sampled
+    (PROFILER_SAMPLE_RATE) or carries `X-Profile: <PROFILER_SECRET>`.
+    At most one request per process is profiled at a time, and only the
+    newest PROFILER_MAX_FILES dumps are kept. Open them with pstats or
+    snakeviz.
+    """
+
+    def __init__(self, app=None):
+        self.busy = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sample_rate = app.config.get("PROFILER_SAMPLE_RATE", 0.0)
+        self.secret = app.config.get("PROFILER_SECRET")
+        self.directory = app.config.get("PROFILER_DIR", "profiles")
+        self.max_files = app.config.get("PROFILER_MAX_FILES", 100)
+        self.logger = app.logger
+        app.extensions["profiler"] = self
+
+        if app.config.get("PROFILER_ENABLED"):
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+            app.teardown_request(self.teardown_request)
+
+    def wants_profile(self):
+        header = request.headers.get(PROFILE_HEADER)
+        if header and self.secret and hmac.compare_digest(header, self.secret):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def before_request(self):
+        if not self.wants_profile() or not self.busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        request.environ[ENVIRON_KEY] = profiler
+        profiler.enable()
+        return None
+
+    def after_request(self, response):
+        profiler = request.environ.pop(ENVIRON_KEY, None)
+        if profiler is None:
+            return response
+
+        profiler.disable()
+        try:
+            path = self.dump(profiler)
+            response.headers["X-Profile-File"] = os.path.basename(path)
+        except OSError as e:
+            self.logger.error(f"Could not write profile: {str(e)}")
+        finally:
+            self.busy.release()
+        return response
+
+    def teardown_request(self, exc=None):
+        # after_request is skipped when the view raised, release here instead
+        profiler = request.environ.pop(ENVIRON_KEY, None)
+        if profiler is not None:
+            profiler.disable()
+            self.busy.release()
+
+    def dump(self, profiler):
+        os.makedirs(self.directory, exist_ok=True)
+        request_id = request.headers.get("X-Request-ID") or request.environ.get("FLASK_REQUEST_ID") or uuid.uuid4().hex
+        safe_id = re.sub(r"[^A-Za-z0-9_-]", "", request_id)[:64]
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.endpoint or 'unknown'}-{safe_id}.prof"
+        path = os.path.join(self.directory, filename)
+        profiler.dump_stats(path)
+        self.logger.info(f"Profiled {request.method} {request.path} -> {path}")
+        self.prune()
+        return path
+
+    def prune(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".prof")]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for stale in files[self.max_files:]:
+            os.remove(stale)
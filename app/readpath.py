@@ -0,0 +1,50 @@
+"""
+Read-only fast path for list endpoints.
+
+Lists are fetched as plain column tuples (a Core select of columns, not
+entities) and wrapped in small __slots__ objects that the marshmallow
+schemas dump like model instances. Nothing is added to the identity map
+and no attribute state is tracked, which matters for large lists that are
+only ever serialized.
+
+Rows are read-only snapshots: never use them for writes.
+"""
+from functools import lru_cache
+from sqlalchemy import select
+from app.fieldsets import column_keys
+
+
+class LightRow:
+    __slots__ = ()
+
+    def __init__(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name, None)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+@lru_cache(maxsize=None)
+def row_class(model, slots):
+    return type(f"{model.__name__}Row", (LightRow,), {"__slots__": slots})
+
+
+def light_select(schema_cls, only=None, extra=()):
+    """
+    Returns (statement, row class) for the columns the schema will dump.
+    `extra` names additional slots, filled in by light_rows.
+    """
+    model = schema_cls.Meta.model
+    keys = column_keys(schema_cls, only)
+    return select(*(getattr(model, key) for key in keys)), row_class(model, keys + tuple(extra))
+
+
+def light_rows(result, cls, **extra):
+    """Wraps every row of `result` in `cls`; `extra` values (e.g. a shared owner) are set on each."""
+    rows = [cls(values) for values in result]
+    for name, value in extra.items():
+        for row in rows:
+            setattr(row, name, value)
+    return rows
@@ -0,0 +1,53 @@
+import json
+from flask import make_response, current_app
+
+# Optional fast encoders. Nothing here is required: without orjson we fall
+# back to the stdlib, without msgpack the binary representation is simply
+# not offered during content negotiation.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def dumps_json(data):
+    """Encodes data to JSON bytes using the fastest available encoder."""
+    if orjson is not None and not current_app.config.get("RESTFUL_JSON"):
+        option = orjson.OPT_NON_STR_KEYS
+        if current_app.debug:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+
+    # Same behaviour as flask_restful's stock output_json
+    settings = dict(current_app.config.get("RESTFUL_JSON", {}))
+    if current_app.debug:
+        settings.setdefault("indent", 4)
+    return json.dumps(data, **settings).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """Makes a Flask response with a JSON encoded body."""
+    # always end the json dumps with a new line, like flask_restful does
+    resp = make_response(dumps_json(data) + b"\n", code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+def output_msgpack(data, code, headers=None):
+    """Makes a Flask response with a MessagePack encoded body."""
+    resp = make_response(msgpack.packb(data, use_bin_type=True), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+def register_representations(api):
+    api.representation("application/json")(output_json)
+    if msgpack is not None:
+        api.representation(MSGPACK_MIMETYPE)(output_msgpack)
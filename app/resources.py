@@ -1,11 +1,22 @@
+from contextlib import contextmanager
+from functools import wraps
 from flask import request, url_for, current_app
 from flask_restful import Resource
-from sqlalchemy import delete
+from flask_restful.utils import unpack
+from sqlalchemy import delete, update
 from sqlalchemy.exc import IntegrityError
-from app.models import User, Task
-from app.schemas import UserSchema, TaskSchema
+from werkzeug.exceptions import HTTPException
+from app.models import User, Task, TaskChange, record_task_changes
+from app.schemas import UserSchema, TaskSchema, TaskChangesSchema, TaskFilterSchema, JobSchema
 from app.extensions import db
+from app.idempotency import idempotent
+from app.auth import InvalidToken, current_token
+from app.metrics import observe_bulk
+from app.sharding import use_shard, shard_for_user, shard_for_username, fan_out, group_by_shard
+from app.fieldsets import FieldsetError, requested_fields, schema_for, load_options
+from app.readpath import light_select, light_rows
 from marshmallow import ValidationError
+from werkzeug.security import check_password_hash, generate_password_hash
 
 def error_response(code, message, details=None, status_code=400):
     """Standardized error format for the entire API."""
@@ -19,18 +30,93 @@ def error_response(code, message, details=None, status_code=400):
     }
     return response, status_code
 
+def fieldset_error(err):
+    return error_response("invalid_fields", "Unknown fields requested.", details=err.fields, status_code=400)
+
+def authorize_owner(*user_ids):
+    """Checks the bearer token against the given user ids. Returns an error response or None."""
+    try:
+        token = current_token()
+    except InvalidToken as e:
+        return error_response("invalid_token", str(e), status_code=401)
+
+    if token is None:
+        if current_app.config.get("AUTH_REQUIRED"):
+            return error_response("unauthorized", "A bearer token is required.", status_code=401)
+        return None
+    foreign = [uid for uid in user_ids if uid != token["uid"]]
+    if foreign:
+        current_app.logger.warning(f"Unauthorized access: token of user {token['uid']} used for users {foreign}")
+        return error_response("access_denied", "This resource belongs to another user.", status_code=403)
+    return None
+
+def owner_only(method):
+    """
+    Runs authorize_owner on the URL's user_id before the handler. Used as a
+    Flask-RESTful method decorator, so it also wraps @idempotent and batch
+    sub-requests, and a rejected request never reaches the handler.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        denied = authorize_owner(kwargs["user_id"])
+        if denied:
+            return denied
+        return method(*args, **kwargs)
+    return wrapper
+
+def owner_of_listed_users(method):
+    """
+    owner_only for bulk user operations, which name their users in the
+    body's "users" list: every listed id must be the token's own. Malformed
+    bodies are left to the handler's validation.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        json_data = request.get_json(silent=True)
+        user_ids = json_data.get("users") if isinstance(json_data, dict) else None
+        denied = authorize_owner(*(user_ids if isinstance(user_ids, list) else []))
+        if denied:
+            return denied
+        return method(*args, **kwargs)
+    return wrapper
+
+class OwnedResource(Resource):
+    """Base for resources under /users/<user_id>/: a bearer token must belong to that user."""
+    method_decorators = [owner_only]
+
+def respond_async():
+    """True when the client sent `Prefer: respond-async` (RFC 7240)."""
+    return "respond-async" in request.headers.get("Prefer", "")
+
+def enqueue_job(kind, user_id, payload):
+    """Queues a background job and answers 202 pointing at its status resource."""
+    queue = current_app.extensions["jobs"]
+    job_id = queue.enqueue(kind, dict(payload, user_id=user_id), user_id=user_id)
+    current_app.logger.info(f"Queued job {job_id} ({kind}) for User {user_id}")
+    return job_schema.dump(queue.get(job_id)), 202, {"Location": url_for("jobresource", job_id=job_id)}
+
 user_schema = UserSchema()
 task_schema = TaskSchema()
+task_changes_schema = TaskChangesSchema(partial=True)
+task_filter_schema = TaskFilterSchema()
+job_schema = JobSchema()
+
+BULK_UPDATE_LIMIT = 500
 
 # region User Resources
 
-class UserResource(Resource):
+class UserResource(OwnedResource):
     def get(self, user_id):
         current_app.logger.info(f"Fetching user: {user_id}")
-        user = db.session.get(User, user_id)
+        try:
+            only = requested_fields(UserSchema)
+        except FieldsetError as err:
+            return fieldset_error(err)
+
+        user = db.session.get(User, user_id, options=load_options(UserSchema, only))
         if not user:
             return error_response("user_not_found", f"User with ID {user_id} does not exist.", status_code=404)
-        return user_schema.dump(user), 200
+        return schema_for(UserSchema, only).dump(user), 200
     
     def patch(self, user_id):
         current_app.logger.info(f"Patching user: {user_id}")
@@ -42,6 +128,16 @@ class UserResource(Resource):
         if not json_data:
             return error_response("empty_payload", "No data provided for update.", status_code=400)
 
+        # Usernames are only unique per shard, and a user can't move: a name
+        # that belongs to another shard could never be reserved there.
+        new_name = json_data.get("username")
+        name_shard = shard_for_username(new_name) if isinstance(new_name, str) else None
+        if name_shard is not None and name_shard != shard_for_user(user_id):
+            return error_response(
+                "username_unavailable", "This username can't be used by this account, choose another.",
+                details="The new username belongs to a different shard than the user.", status_code=409
+            )
+
         try:
             updated_user = user_schema.load(json_data, instance=user, partial=True, session=db.session)
             db.session.commit()
@@ -63,6 +159,10 @@ class UserResource(Resource):
         if not user:
             return error_response("user_not_found", "Cannot delete non-existent user.", status_code=404)
 
+        # Users with many tasks can be purged in the background
+        if respond_async():
+            return enqueue_job("purge_user", user_id, {})
+
         try:
             db.session.delete(user)
             db.session.commit()
@@ -73,27 +173,40 @@ class UserResource(Resource):
             return error_response("internal_error", "Database error during deletion.", status_code=500)
 
 class UserListResource(Resource):
+    method_decorators = {"delete": [owner_of_listed_users]}
+
     def get(self):
         current_app.logger.info("Fetching user list.")
-        users = db.session.execute(db.select(User)).scalars().all()
+        try:
+            only = requested_fields(UserSchema)
+        except FieldsetError as err:
+            return fieldset_error(err)
+
+        # Read-only: plain column rows, no ORM instances (see app/readpath.py)
+        stmt, row_cls = light_select(UserSchema, only)
+        users = sorted(fan_out(lambda session: light_rows(session.execute(stmt), row_cls)), key=lambda user: user.id)
         return {
-            "users": user_schema.dump(users, many=True),
+            "users": schema_for(UserSchema, only).dump(users, many=True),
             "links": [
                 {"rel": "self", "href": url_for("userlistresource"), "method": "GET"},
                 {"rel": "bulk_delete", "href": url_for("userlistresource"), "method": "DELETE"}
             ]
         }, 200
 
+    @idempotent
     def post(self):
         json_data = request.get_json()
         if not json_data:
             return error_response("empty_payload", "No input data provided.", status_code=400)
 
+        username = json_data.get("username")
         try:
-            new_user = user_schema.load(json_data, session=db.session)
-            db.session.add(new_user)
-            db.session.commit()
-            return user_schema.dump(new_user), 201
+            # New users live in the shard picked by their username
+            with use_shard(shard_for_username(username) if isinstance(username, str) else None):
+                new_user = user_schema.load(json_data, session=db.session)
+                db.session.add(new_user)
+                db.session.commit()
+                return user_schema.dump(new_user), 201
         except ValidationError as err:
             db.session.rollback()
             return error_response("validation_error", "Creation failed.", details=err.messages, status_code=422)
@@ -105,6 +218,7 @@ class UserListResource(Resource):
             current_app.logger.error(f"User creation error: {str(e)}")
             return error_response("internal_error", "Server error during registration.", status_code=500)
 
+    @idempotent
     def delete(self):
         json_data = request.get_json() or {}
         user_ids = json_data.get("users")
@@ -115,13 +229,28 @@ class UserListResource(Resource):
         if len(user_ids) > 100:
             return error_response("request_too_large", "Batch limit exceeded (Max: 100).", status_code=413)
 
+        if not all(isinstance(uid, int) for uid in user_ids):
+            return error_response("invalid_input", "User IDs must be integers.", status_code=400)
+
+        observe_bulk("user_bulk_delete", len(user_ids))
+        groups = group_by_shard(user_ids)
         try:
-            # Atomic validation check
-            existing_count = db.session.query(User.id).filter(User.id.in_(user_ids)).count()
+            # Atomic validation check, across every shard involved
+            existing_count = 0
+            for shard, ids in groups.items():
+                with use_shard(shard):
+                    existing_count += db.session.query(User.id).filter(User.id.in_(ids)).count()
             if existing_count != len(user_ids):
                 return error_response("resource_mismatch", "One or more user IDs do not exist.", status_code=404)
 
-            db.session.execute(delete(User).where(User.id.in_(user_ids)))
+            for shard, ids in groups.items():
+                with use_shard(shard):
+                    # Tasks go away through ON DELETE CASCADE, so tombstones are written here
+                    cascaded = db.session.execute(
+                        db.select(Task.user_id, Task.id).where(Task.user_id.in_(ids))
+                    ).all()
+                    record_task_changes(db.session.connection(), cascaded, "delete")
+                    db.session.execute(delete(User).where(User.id.in_(ids)))
             db.session.commit()
             return {"message": f"Successfully deleted {len(user_ids)} users."}, 200
         except Exception as e:
@@ -132,15 +261,20 @@ class UserListResource(Resource):
 
 # region Task Resources
 
-class TaskResource(Resource):
+class TaskResource(OwnedResource):
     def get(self, user_id, task_id):
         current_app.logger.info(f"Fetching task '{task_id}' owned by '{user_id}'")
+        try:
+            only = requested_fields(TaskSchema)
+        except FieldsetError as err:
+            return fieldset_error(err)
+
         # 1. Check if the user exists
         if not db.session.get(User, user_id):
             return error_response("user_not_found", "User not found.", status_code=404)
             
         # 2. Check if the task exists globally
-        task = db.session.get(Task, task_id)
+        task = db.session.get(Task, task_id, options=load_options(TaskSchema, only))
         if not task:
             return error_response("task_not_found", "Task not found.", status_code=404)
 
@@ -149,7 +283,7 @@ class TaskResource(Resource):
             current_app.logger.warning(f"Unauthorized access: User {user_id} tried Task {task_id}")
             return error_response("access_denied", "This task does not belong to you.", status_code=403)
                 
-        return task_schema.dump(task), 200
+        return schema_for(TaskSchema, only).dump(task), 200
 
     def patch(self, user_id, task_id):
         task = db.session.get(Task, task_id)
@@ -181,20 +315,30 @@ class TaskResource(Resource):
             db.session.rollback()
             return error_response("internal_error", str(e), status_code=500)
 
-class TaskListResource(Resource):
+class TaskListResource(OwnedResource):
     def get(self, user_id):
-        if not db.session.get(User, user_id):
+        # Read-only: plain column rows, no ORM instances (see app/readpath.py)
+        owner_stmt, owner_cls = light_select(UserSchema, ("id", "username"))
+        owners = light_rows(db.session.execute(owner_stmt.where(User.id == user_id)), owner_cls)
+        if not owners:
             return error_response("user_not_found", "Owner not found.", status_code=404)
-        
-        tasks = db.session.execute(db.select(Task).where(Task.user_id == user_id)).scalars().all()
+
+        try:
+            only = requested_fields(TaskSchema)
+        except FieldsetError as err:
+            return fieldset_error(err)
+
+        stmt, row_cls = light_select(TaskSchema, only, extra=("owner",))
+        tasks = light_rows(db.session.execute(stmt.where(Task.user_id == user_id)), row_cls, owner=owners[0])
         return {
-            "tasks": task_schema.dump(tasks, many=True),
+            "tasks": schema_for(TaskSchema, only).dump(tasks, many=True),
             "links": [
                 {"rel": "self", "href": url_for("tasksresource", user_id=user_id), "method": "GET"},
                 {"rel": "bulk_delete", "href": url_for("tasksresource", user_id=user_id), "method": "DELETE"}
             ]
         }, 200
 
+    @idempotent
     def post(self, user_id):
         if not db.session.get(User, user_id):
             return error_response("user_not_found", "Cannot assign task to non-existent user.", status_code=404)
@@ -212,6 +356,110 @@ class TaskListResource(Resource):
             db.session.rollback()
             return error_response("internal_error", str(e), status_code=500)
 
+    def patch(self, user_id):
+        if not db.session.get(User, user_id):
+            return error_response("user_not_found", "User not found.", status_code=404)
+
+        json_data = request.get_json() or {}
+        if "tasks" in json_data:
+            return self._patch_by_ids(user_id, json_data["tasks"])
+        if "changes" in json_data:
+            return self._patch_by_filter(user_id, json_data.get("filter") or {}, json_data["changes"])
+        return error_response(
+            "invalid_input", "Provide either a list of 'tasks' or a 'filter' with 'changes'.", status_code=400
+        )
+
+    def _patch_by_ids(self, user_id, items):
+        """Applies [{id, ...changes}] with one UPDATE per distinct change set."""
+        if not items or not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return error_response("invalid_input", "'tasks' must be a non-empty list of objects.", status_code=400)
+
+        if len(items) > BULK_UPDATE_LIMIT:
+            return error_response(
+                "request_too_large", f"Cannot update more than {BULK_UPDATE_LIMIT} tasks at once.", status_code=413
+            )
+
+        task_ids = [item.get("id") for item in items]
+        if not all(isinstance(tid, int) for tid in task_ids) or len(set(task_ids)) != len(task_ids):
+            return error_response("invalid_input", "Every task needs a unique integer 'id'.", status_code=400)
+
+        try:
+            changes = task_changes_schema.load(
+                [{k: v for k, v in item.items() if k != "id"} for item in items], many=True
+            )
+        except ValidationError as err:
+            return error_response("validation_error", "Bulk update failed.", details=err.messages, status_code=422)
+
+        observe_bulk("task_bulk_update", len(items))
+
+        # Tasks that receive identical changes share a single statement
+        groups = {}
+        for tid, change in zip(task_ids, changes):
+            if change:
+                groups.setdefault(tuple(sorted(change.items())), []).append(tid)
+
+        try:
+            existing_count = db.session.query(Task.id).filter(
+                Task.id.in_(task_ids),
+                Task.user_id == user_id
+            ).count()
+            if existing_count != len(task_ids):
+                return error_response("resource_mismatch", "One or more tasks not found for this user.", status_code=404)
+
+            updated = 0
+            for change, ids in groups.items():
+                stmt = update(Task).where(Task.id.in_(ids), Task.user_id == user_id).values(dict(change))
+                updated += db.session.execute(stmt).rowcount
+                record_task_changes(db.session.connection(), [(user_id, tid) for tid in ids], "upsert")
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Task bulk update error for User {user_id}: {str(e)}")
+            return error_response("internal_error", "A database error occurred.", status_code=500)
+
+        current_app.logger.info(f"User {user_id} bulk updated {updated} tasks in {len(groups)} statements.")
+        return {"message": f"Successfully updated {updated} tasks.", "updated": updated}, 200
+
+    def _patch_by_filter(self, user_id, filter_data, change_data):
+        """Applies one change set to every task matching the filter."""
+        if not change_data or not isinstance(change_data, dict):
+            return error_response("empty_payload", "No 'changes' provided for update.", status_code=400)
+
+        try:
+            criteria = task_filter_schema.load(filter_data)
+            changes = task_changes_schema.load(change_data)
+        except ValidationError as err:
+            return error_response("validation_error", "Bulk update failed.", details=err.messages, status_code=422)
+
+        if respond_async():
+            return enqueue_job("bulk_update_tasks", user_id, {"filter": filter_data, "changes": change_data})
+
+        conditions = [Task.user_id == user_id]
+        if "ids" in criteria:
+            conditions.append(Task.id.in_(criteria["ids"]))
+        if "priority" in criteria:
+            conditions.append(Task.priority == criteria["priority"])
+        if "deadline_before" in criteria:
+            conditions.append(Task.deadline < criteria["deadline_before"])
+        if "deadline_after" in criteria:
+            conditions.append(Task.deadline > criteria["deadline_after"])
+
+        try:
+            stmt = update(Task).where(*conditions).values(**changes).returning(Task.id)
+            updated_ids = db.session.execute(stmt).scalars().all()
+            record_task_changes(db.session.connection(), [(user_id, tid) for tid in updated_ids], "upsert")
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f"Task bulk update error for User {user_id}: {str(e)}")
+            return error_response("internal_error", "A database error occurred.", status_code=500)
+
+        updated = len(updated_ids)
+        observe_bulk("task_bulk_update", updated)
+        current_app.logger.info(f"User {user_id} bulk updated {updated} tasks by filter.")
+        return {"message": f"Successfully updated {updated} tasks.", "updated": updated}, 200
+
+    @idempotent
     def delete(self, user_id):
         # 1. Existence check for the owner
         if not db.session.get(User, user_id):
@@ -233,6 +481,8 @@ class TaskListResource(Resource):
         if not all(isinstance(tid, int) for tid in task_ids):
             return error_response("invalid_input", "Task IDs must be integers.", status_code=400)
 
+        observe_bulk("task_bulk_delete", len(task_ids))
+
         try:
             # 5. Ownership validation: All IDs must exist AND belong to the URL user_id
             existing_count = db.session.query(Task.id).filter(
@@ -251,6 +501,7 @@ class TaskListResource(Resource):
             )
             
             db.session.execute(stmt)
+            record_task_changes(db.session.connection(), [(user_id, tid) for tid in task_ids], "delete")
             db.session.commit()
             
             current_app.logger.info(f"User {user_id} successfully deleted {len(task_ids)} tasks.")
@@ -261,4 +512,281 @@ class TaskListResource(Resource):
             current_app.logger.error(f"Task bulk delete error for User {user_id}: {str(e)}")
             return error_response("internal_error", "A database error occurred.", status_code=500)
 
+class TaskChangesResource(OwnedResource):
+    def get(self, user_id):
+        if not db.session.get(User, user_id):
+            return error_response("user_not_found", "User not found.", status_code=404)
+
+        since = request.args.get("since", 0, type=int)
+        limit = request.args.get("limit", 100, type=int)
+        if since < 0 or not 1 <= limit <= 1000:
+            return error_response(
+                "invalid_input", "'since' must be >= 0 and 'limit' between 1 and 1000.", status_code=400
+            )
+
+        rows = db.session.execute(
+            db.select(TaskChange.seq, TaskChange.task_id, TaskChange.op)
+            .where(TaskChange.user_id == user_id, TaskChange.seq > since)
+            .order_by(TaskChange.seq)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_since = rows[-1].seq if rows else since
+
+        # Only the latest change per task matters to the client
+        latest = {}
+        for row in rows:
+            latest[row.task_id] = row
+
+        upsert_ids = [tid for tid, row in latest.items() if row.op == "upsert"]
+        tasks = {}
+        if upsert_ids:
+            tasks = {
+                task.id: task for task in db.session.execute(
+                    db.select(Task).where(Task.id.in_(upsert_ids), Task.user_id == user_id)
+                ).scalars()
+            }
+
+        changes = []
+        for tid, row in sorted(latest.items(), key=lambda item: item[1].seq):
+            task = tasks.get(tid)
+            if task is None:
+                # Deleted after this change was recorded, its tombstone follows
+                changes.append({"seq": row.seq, "task_id": tid, "op": "delete"})
+            else:
+                changes.append({"seq": row.seq, "task_id": tid, "op": "upsert", "task": task_schema.dump(task)})
+
+        links = [{"rel": "self", "href": url_for("taskchangesresource", user_id=user_id, since=since), "method": "GET"}]
+        if has_more:
+            links.append({
+                "rel": "next",
+                "href": url_for("taskchangesresource", user_id=user_id, since=next_since, limit=limit),
+                "method": "GET"
+            })
+        return {"changes": changes, "next_since": next_since, "has_more": has_more, "links": links}, 200
+
+class TaskExportResource(OwnedResource):
+    def post(self, user_id):
+        if not db.session.get(User, user_id):
+            return error_response("user_not_found", "User not found.", status_code=404)
+        return enqueue_job("export_tasks", user_id, {})
+
+# endregion
+
+# region Job Resources
+
+def _owned_job(job_id):
+    """Returns (job, None) or (None, error response)."""
+    job = current_app.extensions["jobs"].get(job_id)
+    if job is None:
+        return None, error_response("job_not_found", f"Job with ID {job_id} does not exist.", status_code=404)
+    if job.user_id is not None:
+        denied = authorize_owner(job.user_id)
+        if denied:
+            return None, denied
+    return job, None
+
+class JobResource(Resource):
+    def get(self, job_id):
+        job, error = _owned_job(job_id)
+        if error:
+            return error
+        return job_schema.dump(job), 200
+
+class JobResultResource(Resource):
+    def get(self, job_id):
+        job, error = _owned_job(job_id)
+        if error:
+            return error
+        if job.status == "failed":
+            return error_response("job_failed", "The job failed.", details=job.error, status_code=409)
+        if job.status != "succeeded":
+            return error_response("job_not_finished", f"The job is {job.status}.", status_code=409)
+        return {
+            "result": job.result,
+            "links": [
+                {"rel": "job", "href": url_for("jobresource", job_id=job.id), "method": "GET"}
+            ]
+        }, 200
+
+# endregion
+
+# region Batch Resources
+
+BATCH_METHODS = {"GET", "POST", "PATCH", "DELETE"}
+
+@contextmanager
+def deferred_commits(session):
+    """Turns handler commits into flushes so a whole batch shares one transaction."""
+    session.commit = session.flush
+    try:
+        yield
+    finally:
+        del session.commit
+
+def dispatch_operation(operation):
+    """Runs one sub-request against the existing resources, without a network hop."""
+    method, path, body = operation["method"], operation["path"], operation.get("body")
+    environ = {"FLASK_REQUEST_ID": request.environ.get("FLASK_REQUEST_ID", "N/A")}
+    headers = {"Authorization": request.headers["Authorization"]} if "Authorization" in request.headers else {}
+
+    with current_app.test_request_context(path, method=method, json=body, headers=headers,
+                                          environ_overrides=environ):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+
+            view = current_app.view_functions[request.url_rule.endpoint]
+            resource_class = getattr(view, "view_class", None)
+            # Sub-requests skip before_request hooks, so anything behind a rate
+            # limit (and credential checks) must arrive as a request of its own.
+            # Jobs are enqueued on their own connection and would outlive a
+            # rolled back batch (Prefer isn't forwarded, so only the export
+            # always enqueues)
+            admission = current_app.extensions["admission"]
+            if (resource_class is None
+                    or resource_class in (BatchResource, LoginResource, LogoutResource, TaskExportResource)
+                    or admission.rate_limited(request.url_rule.endpoint, method)):
+                return error_response("invalid_operation", f"'{path}' cannot be used in a batch.", status_code=400)
+            if not hasattr(resource_class, method.lower()):
+                return error_response("method_not_allowed", f"{method} is not supported on '{path}'.", status_code=405)
+
+            user_id = request.view_args.get("user_id")
+            with use_shard(shard_for_user(user_id) if user_id is not None else None):
+                resp = resource_class().dispatch_request(**request.view_args)
+            if hasattr(resp, "get_json"):
+                return resp.get_json(silent=True), resp.status_code
+            data, code, _ = unpack(resp)
+            return data, code
+        except HTTPException as e:
+            return error_response(e.name.lower().replace(" ", "_"), e.description, status_code=e.code)
+
+class BatchResource(Resource):
+    def post(self):
+        json_data = request.get_json() or {}
+        operations = json_data.get("operations")
+        atomic = bool(json_data.get("atomic", False))
+
+        if not operations or not isinstance(operations, list):
+            return error_response("invalid_input", "A list of 'operations' is required.", status_code=400)
+
+        if len(operations) > 100:
+            return error_response("request_too_large", "Batch limit exceeded (Max: 100).", status_code=413)
+
+        for index, op in enumerate(operations):
+            if (
+                not isinstance(op, dict)
+                or not isinstance(op.get("path"), str)
+                or not op["path"].startswith("/")
+                or str(op.get("method", "")).upper() not in BATCH_METHODS
+            ):
+                return error_response(
+                    "invalid_input", "Each operation needs a 'method' and an absolute 'path'.",
+                    details={"index": index}, status_code=400
+                )
+            op["method"] = op["method"].upper()
+
+        current_app.logger.info(f"Running batch of {len(operations)} operations (atomic={atomic}).")
+        observe_bulk("batch", len(operations))
+        results = []
+        committed = True
+
+        if not atomic:
+            for op in operations:
+                data, code = dispatch_operation(op)
+                results.append({"status": code, "body": data})
+        else:
+            session = db.session()
+            failed = False
+            with deferred_commits(session):
+                for op in operations:
+                    if failed:
+                        data, code = error_response(
+                            "batch_aborted", "Skipped because an earlier operation failed.", status_code=424
+                        )
+                    else:
+                        data, code = dispatch_operation(op)
+                        failed = code >= 400
+                    results.append({"status": code, "body": data})
+            try:
+                if failed:
+                    session.rollback()
+                    committed = False
+                else:
+                    session.commit()
+            except Exception as e:
+                session.rollback()
+                current_app.logger.error(f"Batch commit error: {str(e)}")
+                return error_response("internal_error", "A database error occurred.", status_code=500)
+
+        return {"atomic": atomic, "committed": committed, "results": results}, 200
+
+# endregion
+
+# region Admission Resources
+
+class AdmissionResource(Resource):
+    def get(self):
+        admission = current_app.extensions["admission"]
+        return {
+            "rules": admission.stats(),
+            "links": [
+                {"rel": "self", "href": url_for("admissionresource"), "method": "GET"}
+            ]
+        }, 200
+
+# endregion
+
+# region Auth Resources
+
+_dummy_hash = None
+
+def _check_password(user, password):
+    """Spends the same hashing time whether or not the username exists."""
+    global _dummy_hash
+    if user is None:
+        if _dummy_hash is None:
+            _dummy_hash = generate_password_hash("not-a-real-password")
+        check_password_hash(_dummy_hash, password)
+        return False
+    return user.check_password(password)
+
+class LoginResource(Resource):
+    def post(self):
+        json_data = request.get_json(silent=True) or {}
+        username, password = json_data.get("username"), json_data.get("password")
+        if not isinstance(username, str) or not isinstance(password, str):
+            return error_response("invalid_input", "'username' and 'password' are required.", status_code=400)
+
+        with use_shard(shard_for_username(username)):
+            user = db.session.execute(db.select(User).filter_by(username=username)).scalar_one_or_none()
+            if not _check_password(user, password):
+                return error_response("invalid_credentials", "Invalid username or password.", status_code=401)
+            user_id = user.id
+
+        auth = current_app.extensions["auth"]
+        return {
+            "token": auth.issue(user_id),
+            "token_type": "Bearer",
+            "expires_in": auth.max_age,
+            "user_id": user_id,
+            "links": [
+                {"rel": "tasks", "href": url_for("tasksresource", user_id=user_id), "method": "GET"},
+                {"rel": "logout", "href": url_for("logoutresource"), "method": "POST"}
+            ]
+        }, 200
+
+class LogoutResource(Resource):
+    def post(self):
+        try:
+            token = current_token()
+        except InvalidToken as e:
+            return error_response("invalid_token", str(e), status_code=401)
+        if token is None:
+            return error_response("unauthorized", "A bearer token is required.", status_code=401)
+
+        current_app.extensions["auth"].revoke(token)
+        return '', 204
+
 # endregion
@@ -1,5 +1,5 @@
 from app.extensions import ma
-from app.models import User, Task
+from app.models import User, Task, Job
 from marshmallow import fields, validate
 from flask import url_for
 from marshmallow import RAISE
@@ -52,3 +52,42 @@ class TaskSchema(ma.SQLAlchemyAutoSchema):
             {"rel": "delete", "href": url_for("taskresource", user_id=obj.user_id, task_id=obj.id), "method": "DELETE"},
             {"rel": "owner", "href": url_for("userresource", user_id=obj.user_id), "method": "GET"}
         ]
+
+class TaskChangesSchema(TaskSchema):
+    """A change set applied to existing tasks (bulk PATCH); the primary key is not writable."""
+    class Meta(TaskSchema.Meta):
+        load_instance = False
+        exclude = ("id",)
+
+class TaskFilterSchema(ma.Schema):
+    """Selects tasks for set-based operations (e.g. bulk PATCH)."""
+    class Meta:
+        unknown = RAISE
+
+    ids = fields.List(fields.Integer(), validate=validate.Length(min=1))
+    priority = fields.Integer(validate=validate.Range(min=1, max=3))
+    deadline_before = fields.DateTime(format=FORMAT_CODE)
+    deadline_after = fields.DateTime(format=FORMAT_CODE)
+
+class JobSchema(ma.SQLAlchemyAutoSchema):
+    """Job status as shown by GET /jobs/<id> (dumps Job rows or Core rows)."""
+    class Meta:
+        model = Job
+        exclude = ("payload", "result", "locked_by", "locked_at", "progress_done", "progress_total")
+
+    created_at = fields.DateTime(dump_only=True, format=FORMAT_CODE)
+    run_after = fields.DateTime(dump_only=True, format=FORMAT_CODE)
+    finished_at = fields.DateTime(dump_only=True, format=FORMAT_CODE)
+    progress = fields.Method("get_progress")
+    links = fields.Method("get_links")
+
+    def get_progress(self, obj):
+        return {"done": obj.progress_done, "total": obj.progress_total}
+
+    def get_links(self, obj):
+        links = [{"rel": "self", "href": url_for("jobresource", job_id=obj.id), "method": "GET"}]
+        if obj.status == "succeeded":
+            links.append({"rel": "result", "href": url_for("jobresultresource", job_id=obj.id), "method": "GET"})
+        if obj.user_id is not None:
+            links.append({"rel": "owner", "href": url_for("userresource", user_id=obj.user_id), "method": "GET"})
+        return links
@@ -0,0 +1,145 @@
+import os
+import signal
+import socket
+import threading
+import time
+from werkzeug.serving import make_server
+from app.sharding import all_engines
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+class PreforkServer:
+    """
+    Pre-forking server: the app is created once in the master, which binds
+    the listening socket and forks workers that accept on it. SIGTERM lets
+    workers finish in-flight requests before they exit.
+    """
+
+    def __init__(self, app, host, port, workers=None, graceful_timeout=30):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.num_workers = workers or default_workers()
+        self.graceful_timeout = graceful_timeout
+        self.workers = set()
+        self.stopping = False
+        self.sock = None
+
+    def run(self):
+        self.sock = socket.create_server((self.host, self.port), backlog=2048)
+        self.sock.set_inheritable(True)
+        self.port = self.sock.getsockname()[1]
+
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+
+        self.app.logger.info(f"Master {os.getpid()} listening on {self.host}:{self.port} "
+                             f"with {self.num_workers} workers")
+        try:
+            while not self.stopping:
+                self.reap_workers()
+                while len(self.workers) < self.num_workers and not self.stopping:
+                    self.spawn_worker()
+                time.sleep(0.2)
+        finally:
+            self.stop_workers()
+            self.sock.close()
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def reap_workers(self):
+        for pid in list(self.workers):
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                self.workers.discard(pid)
+                if not self.stopping:
+                    self.app.logger.warning(f"Worker {pid} exited ({status}), respawning")
+
+    def spawn_worker(self):
+        # Signals are held across fork() until the child has replaced the
+        # master's handlers, which would only flip a flag on its copy of self.
+        stop_signals = {signal.SIGTERM, signal.SIGINT}
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        pid = os.fork()
+        if pid:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            self.workers.add(pid)
+            return
+
+        drain_fd = self.install_worker_signals()
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+        code = 1
+        try:
+            code = self.worker_main(drain_fd)
+        except Exception as e:
+            self.app.logger.error(f"Worker {os.getpid()} crashed: {str(e)}")
+        finally:
+            os._exit(code)
+
+    def install_worker_signals(self):
+        """
+        SIGTERM only writes to a self-pipe (async-signal safe); a regular
+        thread reads it and shuts the server down. Returns the read end.
+        """
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the master
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(write_fd, False)
+
+        def request_drain(signum, frame):
+            try:
+                os.write(write_fd, b"x")
+            except BlockingIOError:
+                pass  # a drain is already pending
+
+        signal.signal(signal.SIGTERM, request_drain)
+        return read_fd
+
+    def worker_main(self, drain_fd):
+        # Pooled connections inherited from the master must never be shared
+        # between processes; close=False leaves the parent's sockets alone.
+        with self.app.app_context():
+            for engine in all_engines().values():
+                engine.dispose(close=False)
+
+        server = make_server(self.host, self.port, self.app, threaded=True, fd=self.sock.fileno())
+        # Join request threads on close so a drain lets them finish
+        server.daemon_threads = False
+        server.block_on_close = True
+
+        def drain():
+            # shutdown() blocks until serve_forever returns, so it can't run
+            # on the thread that is inside serve_forever. A drain requested
+            # before serve_forever starts makes it return immediately.
+            os.read(drain_fd, 1)
+            server.shutdown()
+
+        threading.Thread(target=drain, daemon=True).start()
+        self.app.logger.info(f"Worker {os.getpid()} started")
+        server.serve_forever()
+        server.server_close()
+
+        metrics = self.app.extensions.get("metrics")
+        if metrics is not None:
+            with self.app.app_context():
+                metrics.close()
+        self.app.logger.info(f"Worker {os.getpid()} drained")
+        return 0
+
+    def stop_workers(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.workers and time.monotonic() < deadline:
+            self.reap_workers()
+            time.sleep(0.1)
+
+        for pid in self.workers:
+            self.app.logger.warning(f"Worker {pid} did not drain in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.clear()
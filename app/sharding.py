@@ -0,0 +1,184 @@
+"""
+Horizontal sharding of users (and everything under /users/<user_id>/...).
+
+Shards are the databases listed in the SHARDS config. Every user
+and task id encodes its shard as `id % SHARD_SLOTS`, so any URL carrying a
+user_id can be routed without a lookup. New users are placed by a hash of
+their username, which keeps usernames unique per shard and therefore
+globally.
+
+Routing is a context variable read by ShardedSession.get_bind: requests
+with a user_id in the URL are routed automatically, everything else uses
+`use_shard` or the `fan_out`/`group_by_shard` helpers.
+"""
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+import click
+import sqlalchemy as sa
+from flask import request, current_app
+from flask_sqlalchemy.session import Session
+
+# Ids are spread over a fixed number of slots; shard N owns slot N. Keeping
+# this larger than the number of shards lets shards be appended later
+# without renumbering existing ids.
+SHARD_SLOTS = 64
+ENVIRON_KEY = "taskpro.shard_token"
+
+current_shard = ContextVar("current_shard", default=None)
+
+# Lives next to the models in every shard, not part of db.metadata
+shard_metadata = sa.MetaData()
+id_allocations = sa.Table(
+    "id_allocations", shard_metadata,
+    sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+)
+
+
+class ShardedSession(Session):
+    """Sends every statement to the engine of the current shard, if any."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = current_shard.get()
+        if bind is None and shard is not None:
+            return current_app.extensions["shards"].engines[shard]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ShardMap:
+    def __init__(self, app=None):
+        self.names = []
+        self.engines = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        shards = app.config.get("SHARDS") or {}
+        if not shards:
+            return
+        if len(shards) > SHARD_SLOTS:
+            raise ValueError(f"At most {SHARD_SLOTS} shards are supported.")
+
+        # Engines are kept here rather than in SQLALCHEMY_BINDS: binds would
+        # make db.create_all() expect every shard in every app.
+        self.names = list(shards)
+        self.engines = {name: sa.create_engine(uri) for name, uri in shards.items()}
+        app.extensions["shards"] = self
+
+        app.before_request(self.before_request)
+        app.teardown_request(self.teardown_request)
+        app.cli.add_command(shards_cli)
+
+    def shard_for_id(self, entity_id):
+        slot = entity_id % SHARD_SLOTS
+        # Ids in unused slots can't exist; route them anywhere to get a 404
+        return self.names[slot] if slot < len(self.names) else self.names[0]
+
+    def shard_for_username(self, username):
+        return self.names[zlib.crc32(username.encode("utf-8")) % len(self.names)]
+
+    def before_request(self):
+        user_id = (request.view_args or {}).get("user_id")
+        if user_id is not None:
+            request.environ[ENVIRON_KEY] = current_shard.set(self.shard_for_id(user_id))
+
+    def teardown_request(self, exc=None):
+        token = request.environ.pop(ENVIRON_KEY, None)
+        if token is not None:
+            current_shard.reset(token)
+
+
+def get_shard_map():
+    return current_app.extensions.get("shards")
+
+
+@contextmanager
+def use_shard(shard):
+    """Routes the session to `shard` inside the block (no-op for None)."""
+    if shard is None:
+        yield
+        return
+    token = current_shard.set(shard)
+    try:
+        yield
+    finally:
+        current_shard.reset(token)
+
+
+def shard_for_user(user_id):
+    shard_map = get_shard_map()
+    return shard_map.shard_for_id(user_id) if shard_map else None
+
+
+def shard_for_username(username):
+    shard_map = get_shard_map()
+    return shard_map.shard_for_username(username) if shard_map else None
+
+
+def fan_out(query):
+    """Runs `query(session)` on every shard (once when unsharded) and concatenates the results."""
+    from app.extensions import db
+
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return list(query(db.session))
+
+    results = []
+    for shard in shard_map.names:
+        with use_shard(shard):
+            results.extend(query(db.session))
+    return results
+
+
+def group_by_shard(user_ids):
+    """Splits user ids into {shard: [ids]} ({None: ids} when unsharded)."""
+    shard_map = get_shard_map()
+    if shard_map is None:
+        return {None: list(user_ids)}
+
+    groups = {}
+    for user_id in user_ids:
+        groups.setdefault(shard_map.shard_for_id(user_id), []).append(user_id)
+    return groups
+
+
+def assign_sharded_id(mapper, connection, target):
+    """before_insert hook: ids are allocated per shard and tagged with its slot."""
+    shard_map = get_shard_map()
+    shard = current_shard.get()
+    if shard_map is None or shard is None or target.id is not None:
+        return
+
+    local_id = connection.execute(sa.insert(id_allocations)).inserted_primary_key[0]
+    target.id = local_id * SHARD_SLOTS + shard_map.names.index(shard)
+
+
+def all_engines():
+    """Every engine of the current app by name: the default bind plus the shards."""
+    from app.extensions import db
+
+    engines = {bind or "default": engine for bind, engine in db.engines.items()}
+    shard_map = get_shard_map()
+    if shard_map is not None:
+        engines.update(shard_map.engines)
+    return engines
+
+
+def create_all_shards():
+    from app.extensions import db
+
+    for engine in get_shard_map().engines.values():
+        db.metadata.create_all(engine)
+        shard_metadata.create_all(engine)
+
+
+@click.group("shards")
+def shards_cli():
+    """Manage user shards."""
+
+
+@shards_cli.command("create-all")
+def create_all_command():
+    """Create the schema in every shard listed in SHARDS."""
+    create_all_shards()
+    click.echo(f"Created tables in {len(get_shard_map().names)} shards.")
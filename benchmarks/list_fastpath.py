@@ -0,0 +1,130 @@
+"""
+List serialization benchmark: ORM entities vs the read-only fast path
+(column tuples in __slots__ rows, see app/readpath.py).
+
+Both paths load every task of one user and dump it with TaskSchema, the
+way GET /users/<id>/tasks does. Time is the median over --runs; peak
+memory is measured in a separate pass with tracemalloc, which would
+otherwise skew the timings. Results are printed as one JSON line tagged
+with the current commit; pass --output to append them to a file.
+
+    python benchmarks/list_fastpath.py --rows 100000 --runs 5
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Task, User  # noqa: E402
+from app.readpath import light_rows, light_select  # noqa: E402
+from app.schemas import TaskSchema, UserSchema  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    METRICS_ENABLED = False
+    ADMISSION_ENABLED = False
+
+
+def populate(rows):
+    user = User(username="bench", password="password123")
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+    db.session.execute(db.insert(Task), [
+        {"user_id": user_id, "name": f"task {i}", "description": "benchmark row", "priority": i % 3 + 1}
+        for i in range(rows)
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+    return user_id
+
+
+def orm_path(user_id, schema):
+    tasks = db.session.execute(db.select(Task).where(Task.user_id == user_id)).scalars().all()
+    loaded = time.perf_counter()
+    return loaded, schema.dump(tasks, many=True)
+
+
+def fast_path(user_id, schema):
+    owner_stmt, owner_cls = light_select(UserSchema, ("id", "username"))
+    owner = light_rows(db.session.execute(owner_stmt.where(User.id == user_id)), owner_cls)[0]
+    stmt, row_cls = light_select(TaskSchema, None, extra=("owner",))
+    tasks = light_rows(db.session.execute(stmt.where(Task.user_id == user_id)), row_cls, owner=owner)
+    loaded = time.perf_counter()
+    return loaded, schema.dump(tasks, many=True)
+
+
+def measure(path, user_id, schema):
+    db.session.expunge_all()
+    gc.collect()
+    start = time.perf_counter()
+    loaded, dumped = path(user_id, schema)
+    end = time.perf_counter()
+    assert len(dumped) > 0
+    return {"load_ms": (loaded - start) * 1000, "dump_ms": (end - loaded) * 1000, "total_ms": (end - start) * 1000}
+
+
+def peak_memory_mb(path, user_id, schema):
+    db.session.expunge_all()
+    gc.collect()
+    tracemalloc.start()
+    path(user_id, schema)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    # url_for (HATEOAS links) needs a request context
+    with app.test_request_context():
+        db.create_all()
+        user_id = populate(args.rows)
+        schema = TaskSchema()
+
+        result = {"commit": current_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                  "rows": args.rows, "runs": args.runs}
+        for name, path in (("orm", orm_path), ("fast", fast_path)):
+            samples = [measure(path, user_id, schema) for _ in range(args.runs)]
+            for key in ("load_ms", "dump_ms", "total_ms"):
+                result[f"{name}_{key}"] = round(statistics.median(s[key] for s in samples), 2)
+            result[f"{name}_rows_per_s"] = round(args.rows / (result[f"{name}_total_ms"] / 1000))
+            result[f"{name}_peak_mb"] = round(peak_memory_mb(path, user_id, schema), 2)
+        result["speedup"] = round(result["orm_total_ms"] / result["fast_total_ms"], 2)
+
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cold start benchmark: import time, create_app time and time-to-first-response.
+
+Every run happens in a fresh interpreter so nothing is cached between runs.
+Results are printed as one JSON line tagged with the current commit; pass
+--output to append them to a file and track them across commits.
+
+    python benchmarks/startup.py --runs 10 --output startup.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+import config
+t1 = time.perf_counter()
+app = create_app(getattr(config, {config!r}))
+t2 = time.perf_counter()
+response = app.test_client().get("/admission")
+t3 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000,
+                  "first_response_ms": (t3 - t2) * 1000, "migrate_loaded": "flask_migrate" in __import__("sys").modules}}))
+"""
+
+
+def run_once(config_name, env):
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(config=config_name)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    sample = json.loads(out.strip().splitlines()[-1])
+    sample["process_ms"] = (time.perf_counter() - start) * 1000
+    return sample
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--config", default="ProductionConfig", help="config class name in config.py")
+    parser.add_argument("--output", help="append the result as a JSON line to this file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+    samples = [run_once(args.config, env) for _ in range(args.runs)]
+    result = {
+        "commit": current_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": args.config,
+        "runs": args.runs,
+        "migrate_loaded": samples[0]["migrate_loaded"],
+    }
+    for key in ("import_ms", "create_app_ms", "first_response_ms", "process_ms"):
+        result[key] = round(statistics.median(s[key] for s in samples), 2)
+
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
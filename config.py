@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -12,3 +13,81 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     SECRET_KEY = os.getenv("SECRET_KEY", "fallback-if-missing")
+
+    # Serving-only processes skip tooling like Flask-Migrate at startup
+    SERVING_MODE = os.getenv("SERVING_MODE", "0") == "1"
+
+    # Response compression (gzip/deflate, zstd if `zstandard` is installed)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 500))  # bytes
+    COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+    # Bodies above this size are compressed chunk by chunk and sent streamed
+    COMPRESSION_STREAM_THRESHOLD = int(os.getenv("COMPRESSION_STREAM_THRESHOLD", 1024 * 1024))
+
+    # Admission control (see app/admission.py). Password hashing makes user
+    # registration CPU bound, bulk deletes hold locks on many rows.
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+    USER_CREATE_CONCURRENCY = int(os.getenv("USER_CREATE_CONCURRENCY", 4))
+    USER_CREATE_RATE = float(os.getenv("USER_CREATE_RATE", 20))  # requests/second
+    USER_CREATE_BURST = int(os.getenv("USER_CREATE_BURST", 40))
+    BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 2))
+    ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", 8))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 0.5))  # seconds
+
+    # Idempotency-Key replay store (idempotency_keys table, shared by all workers)
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 3600))  # seconds
+    # A key still pending after this long belongs to a crashed request and is reused
+    IDEMPOTENCY_PENDING_TIMEOUT = int(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", 60))  # seconds
+
+    # DDL waits at most this long for locks on PostgreSQL, then fails
+    MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", 5000))
+
+    # Opt-in request profiler: sampled requests, or those sending X-Profile: <secret>
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", 0.0))
+    PROFILER_SECRET = os.getenv("PROFILER_SECRET")
+    PROFILER_DIR = os.getenv("PROFILER_DIR", "profiles")
+    PROFILER_MAX_FILES = int(os.getenv("PROFILER_MAX_FILES", 100))
+
+    # Prometheus /metrics. Multi-process servers need a shared METRICS_DIR
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 1.0))  # seconds
+
+    # Bearer tokens from POST /auth/login, checked on /users/<id>/... and on
+    # the ids listed in DELETE /users. Without AUTH_REQUIRED, ownership is
+    # only enforced for requests that do send a token.
+    AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "0") == "1"
+    # Logout only revokes a token in the worker that handled it (see
+    # app/auth.py), so this bounds how long a logged-out token stays usable
+    AUTH_TOKEN_MAX_AGE = int(os.getenv("AUTH_TOKEN_MAX_AGE", 300))  # seconds
+    AUTH_REVOCATION_CACHE_SIZE = int(os.getenv("AUTH_REVOCATION_CACHE_SIZE", 10000))
+    LOGIN_RATE = float(os.getenv("LOGIN_RATE", 10))  # requests/second
+    LOGIN_BURST = int(os.getenv("LOGIN_BURST", 20))
+
+    # Background jobs (`flask jobs work`), retried with exponential backoff
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+    JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", 2.0))  # seconds, doubled per attempt
+    JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", 300))  # seconds
+    JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", 600))  # seconds before a silent worker's job is retaken
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))  # seconds
+    JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 500))  # rows per transaction
+
+    # User shards: {"name": "database uri", ...}; empty means a single database.
+    # Shard order is part of the id scheme, only ever append to it.
+    SHARDS = json.loads(os.getenv("SHARDS", "{}"))
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    # Skip migration tooling when serving; run `flask --app run db ...` instead
+    SERVING_MODE = True
+    # Forked workers append to one log file, see configure_logging
+    LOG_MULTIPROCESS = True
+    # Workers publish metric snapshots here so /metrics can sum them
+    METRICS_DIR = os.getenv("METRICS_DIR", "metrics")
+
+    SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", 8000))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 0))  # 0 = one per CPU
+    SERVER_GRACEFUL_TIMEOUT = float(os.getenv("SERVER_GRACEFUL_TIMEOUT", 30))  # seconds
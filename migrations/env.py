@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from app.online_migrations import checkpoints, set_lock_timeout
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -90,13 +92,23 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # the checkpoint table of app/online_migrations.py is not part of the
+    # models, keep autogenerate from dropping it
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (type_ == "table" and name == checkpoints.name)
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
+    # autocommit blocks (CREATE INDEX CONCURRENTLY, chunked backfills) commit
+    # everything before them, so keep each migration in its own transaction
+    conf_args.setdefault("transaction_per_migration", True)
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        set_lock_timeout(connection, current_app.config.get('MIGRATION_LOCK_TIMEOUT_MS'))
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
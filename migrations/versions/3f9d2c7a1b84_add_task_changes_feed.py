@@ -0,0 +1,36 @@
+"""add task_changes feed
+
+Revision ID: 3f9d2c7a1b84
+Revises: 85ee996d069c
+Create Date: 2026-10-19 10:12:41.532118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9d2c7a1b84'
+down_revision = '85ee996d069c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_changes',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    with op.batch_alter_table('task_changes', schema=None) as batch_op:
+        batch_op.create_index('ix_task_changes_user_seq', ['user_id', 'seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_changes', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_changes_user_seq')
+
+    op.drop_table('task_changes')
@@ -0,0 +1,28 @@
+"""index tasks.user_id
+
+Revision ID: a71e5b0c92d3
+Revises: 3f9d2c7a1b84
+Create Date: 2026-10-19 11:03:27.804512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = 'a71e5b0c92d3'
+down_revision = '3f9d2c7a1b84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Every /users/<id>/tasks query filters on user_id; build the index
+    # without blocking writes to the (large) tasks table.
+    create_index_concurrently(op.f('ix_tasks_user_id'), 'tasks', ['user_id'])
+
+
+def downgrade():
+    drop_index_concurrently(op.f('ix_tasks_user_id'), 'tasks')
@@ -0,0 +1,17 @@
+from app import create_app
+from app.server import PreforkServer
+from config import ProductionConfig
+
+# Production entrypoint: the app is built once here, before the workers fork
+app = create_app(ProductionConfig)
+
+if __name__ == "__main__":
+    # Metric snapshots from a previous run would be summed into this one
+    app.extensions["metrics"].reset_storage()
+    PreforkServer(
+        app,
+        host=app.config["SERVER_HOST"],
+        port=app.config["SERVER_PORT"],
+        workers=app.config["SERVER_WORKERS"],
+        graceful_timeout=app.config["SERVER_GRACEFUL_TIMEOUT"],
+    ).run()
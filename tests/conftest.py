@@ -19,6 +19,30 @@ def app():
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture
+def make_app():
+    """
+    Builds an app from TestConfig with the given config overrides, tables
+    created and its app context pushed; torn down after the test.
+
+        app = make_app(PROFILER_ENABLED=True)
+    """
+    contexts = []
+
+    def factory(**overrides):
+        app = create_app(type("OverrideConfig", (TestConfig,), overrides))
+        ctx = app.app_context()
+        ctx.push()
+        contexts.append(ctx)
+        db.create_all()
+        return app
+
+    yield factory
+    for ctx in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        ctx.pop()
+
 @pytest.fixture
 def client(app):
     return app.test_client()
@@ -0,0 +1,42 @@
+from flask import current_app
+
+
+def get_rule(endpoint, method):
+    return current_app.extensions["admission"].rules[(endpoint, method)]
+
+def test_rate_limited_user_creation(client, app):
+    rule = get_rule("userlistresource", "POST")
+    rule.bucket.tokens = 0
+    rule.bucket.rate = 0.5
+    response = client.post("/users", json={"username": "burstuser", "password": "password123"})
+
+    assert response.status_code == 429
+    assert response.get_json()["error"]["code"] == "rate_limited"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert rule.rate_limited == 1
+
+def test_overloaded_bulk_delete_is_shed(client, app, existing_tasks):
+    task, _ = existing_tasks
+    rule = get_rule("tasksresource", "DELETE")
+    rule.limiter.queue_timeout = 0
+    for _ in range(rule.limiter.limit):
+        rule.limiter.acquire()
+
+    response = client.delete(f"/users/{task.user_id}/tasks", json={"tasks": [task.id]})
+    assert response.status_code == 503
+    assert response.get_json()["error"]["code"] == "server_overloaded"
+    assert "Retry-After" in response.headers
+
+def test_slot_released_after_request(client, existing_tasks):
+    task, _ = existing_tasks
+    response = client.delete(f"/users/{task.user_id}/tasks", json={"tasks": [task.id]})
+    assert response.status_code == 200
+    assert get_rule("tasksresource", "DELETE").limiter.active == 0
+
+def test_admission_stats(client):
+    client.post("/users", json={"username": "statsuser", "password": "password123"})
+    response = client.get("/admission")
+    assert response.status_code == 200
+    stats = {(r["endpoint"], r["method"]): r for r in response.get_json()["rules"]}
+    assert stats[("userlistresource", "POST")]["admitted"] == 1
+    assert stats[("userlistresource", "POST")]["queue_depth"] == 0
@@ -0,0 +1,172 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Task, User
+from conftest import TestConfig
+
+
+def login(client, username="preexisting1", password="password123"):
+    return client.post("/auth/login", json={"username": username, "password": password})
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+def test_login_issues_token(client, existing_users):
+    user1, _ = existing_users
+    response = login(client)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["token_type"] == "Bearer"
+    assert data["user_id"] == user1.id
+    assert data["expires_in"] == TestConfig.AUTH_TOKEN_MAX_AGE
+
+@pytest.mark.parametrize("username, password", [("preexisting1", "wrong-password"), ("nobody", "password123")])
+def test_login_rejects_bad_credentials(client, existing_users, username, password):
+    response = login(client, username, password)
+
+    assert response.status_code == 401
+    assert response.get_json()["error"]["code"] == "invalid_credentials"
+
+def test_token_grants_access_without_db_lookup(app, client, existing_tasks):
+    task1, _ = existing_tasks
+    user_id, task_id = task1.user_id, task1.id
+    token = login(client).get_json()["token"]
+    auth = app.extensions["auth"]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+        assert auth.verify(token)["uid"] == user_id
+    finally:
+        event.remove(db.engine, "before_cursor_execute", listener)
+    assert statements == []
+
+    response = client.get(f"/users/{user_id}/tasks/{task_id}", headers=bearer(token))
+    assert response.status_code == 200
+
+def test_token_of_other_user_is_denied(client, existing_users, existing_tasks):
+    _, user2 = existing_users
+    task1, _ = existing_tasks
+    token = login(client, "preexisting2").get_json()["token"]
+
+    for method in ("get", "patch", "delete"):
+        response = getattr(client, method)(f"/users/{task1.user_id}/tasks/{task1.id}",
+                                           json={"name": "x"}, headers=bearer(token))
+        assert response.status_code == 403
+        assert response.get_json()["error"]["code"] == "access_denied"
+
+def owned_routes(user_id, task_id):
+    return [
+        ("get", f"/users/{user_id}", None),
+        ("patch", f"/users/{user_id}", {"username": "hijacked"}),
+        ("delete", f"/users/{user_id}", None),
+        ("get", f"/users/{user_id}/tasks", None),
+        ("post", f"/users/{user_id}/tasks", {"name": "planted"}),
+        ("patch", f"/users/{user_id}/tasks", {"tasks": [{"id": task_id, "name": "x"}]}),
+        ("patch", f"/users/{user_id}/tasks", {"filter": {}, "changes": {"name": "x"}}),
+        ("delete", f"/users/{user_id}/tasks", {"tasks": [task_id]}),
+        ("get", f"/users/{user_id}/tasks/changes", None),
+        ("post", f"/users/{user_id}/tasks/export", None),
+    ]
+
+def test_token_of_other_user_is_denied_on_bulk_and_list_routes(client, existing_users, existing_tasks):
+    task1, _ = existing_tasks
+    user_id, task_id, name = task1.user_id, task1.id, task1.name
+    token = login(client, "preexisting2").get_json()["token"]
+
+    for method, url, body in owned_routes(user_id, task_id):
+        response = getattr(client, method)(url, json=body, headers=bearer(token))
+        assert response.status_code == 403, (method, url)
+
+    db.session.expire_all()
+    assert db.session.get(Task, task_id).name == name
+
+def test_bulk_user_delete_is_limited_to_own_account(client, existing_users):
+    user1, user2 = existing_users
+    token = login(client).get_json()["token"]
+
+    response = client.delete("/users", json={"users": [user1.id, user2.id]}, headers=bearer(token))
+    assert response.status_code == 403
+    assert response.get_json()["error"]["code"] == "access_denied"
+
+    response = client.delete("/users", json={"users": [user1.id]}, headers=bearer(token))
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user2.id) is not None
+
+def test_denied_request_is_not_stored_for_idempotency(client, existing_users):
+    user1, _ = existing_users
+    url, headers = f"/users/{user1.id}/tasks", {"Idempotency-Key": "k-1"}
+    other = login(client, "preexisting2").get_json()["token"]
+    owner = login(client).get_json()["token"]
+
+    assert client.post(url, json={"name": "Mine"}, headers={**headers, **bearer(other)}).status_code == 403
+    assert client.post(url, json={"name": "Mine"}, headers={**headers, **bearer(owner)}).status_code == 201
+
+def test_tampered_token_is_rejected(client, existing_tasks):
+    task1, _ = existing_tasks
+    token = login(client).get_json()["token"]
+
+    response = client.get(f"/users/{task1.user_id}/tasks/{task1.id}", headers=bearer(token[:-2] + "xx"))
+    assert response.status_code == 401
+    assert response.get_json()["error"]["code"] == "invalid_token"
+
+def test_expired_token_is_rejected(app, client, existing_tasks):
+    task1, _ = existing_tasks
+    token = login(client).get_json()["token"]
+    app.extensions["auth"].max_age = -1
+
+    response = client.get(f"/users/{task1.user_id}/tasks/{task1.id}", headers=bearer(token))
+    assert response.status_code == 401
+
+def test_logout_revokes_only_that_token(client, existing_tasks):
+    task1, _ = existing_tasks
+    url = f"/users/{task1.user_id}/tasks/{task1.id}"
+    first = login(client).get_json()["token"]
+    second = login(client).get_json()["token"]
+
+    assert client.post("/auth/logout", headers=bearer(first)).status_code == 204
+    assert client.get(url, headers=bearer(first)).status_code == 401
+    assert client.get(url, headers=bearer(second)).status_code == 200
+
+def test_revocation_cache_is_bounded(app):
+    auth = app.extensions["auth"]
+    auth.max_revoked = 2
+    tokens = [auth.verify(auth.issue(1)) for _ in range(3)]
+    for token in tokens:
+        auth.revoke(token)
+
+    assert list(auth.revoked) == [tokens[1]["jti"], tokens[2]["jti"]]
+
+def test_batch_forwards_token(client, existing_users, existing_tasks):
+    _, user2 = existing_users
+    task1, _ = existing_tasks
+    token = login(client, "preexisting2").get_json()["token"]
+
+    response = client.post("/batch", headers=bearer(token), json={"operations": [
+        {"method": "GET", "path": f"/users/{task1.user_id}/tasks/{task1.id}"},
+    ]})
+    assert response.get_json()["results"][0]["status"] == 403
+
+@pytest.fixture
+def strict_client(make_app):
+    return make_app(AUTH_REQUIRED=True).test_client()
+
+def test_auth_required_rejects_missing_token(strict_client):
+    response = strict_client.get("/users/1/tasks/1")
+
+    assert response.status_code == 401
+    assert response.get_json()["error"]["code"] == "unauthorized"
+
+def test_auth_required_covers_every_owned_route(strict_client):
+    for method, url, body in owned_routes(1, 1):
+        response = getattr(strict_client, method)(url, json=body)
+        assert response.status_code == 401, (method, url)
+
+def test_auth_required_covers_bulk_user_delete(strict_client):
+    response = strict_client.delete("/users", json={"users": [1, 2]})
+
+    assert response.status_code == 401
+    assert response.get_json()["error"]["code"] == "unauthorized"
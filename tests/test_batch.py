@@ -0,0 +1,80 @@
+from app.extensions import db
+from app.models import Job, Task
+
+
+def test_batch_mixed_operations(client, existing_tasks):
+    task, _ = existing_tasks
+    u_id = task.user_id
+    response = client.post("/batch", json={"operations": [
+        {"method": "PATCH", "path": f"/users/{u_id}/tasks/{task.id}", "body": {"priority": 3}},
+        {"method": "POST", "path": f"/users/{u_id}/tasks", "body": {"name": "From batch"}},
+        {"method": "GET", "path": "/users/999"},
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r["status"] for r in data["results"]] == [200, 201, 404]
+    assert data["results"][0]["body"]["priority"] == 3
+    assert data["results"][2]["body"]["error"]["code"] == "user_not_found"
+    assert db.session.query(Task).filter_by(name="From batch").count() == 1
+
+def test_batch_atomic_rolls_back(client, existing_tasks):
+    task, _ = existing_tasks
+    u_id = task.user_id
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"method": "POST", "path": f"/users/{u_id}/tasks", "body": {"name": "Rolled back"}},
+        {"method": "PATCH", "path": f"/users/{u_id}/tasks/{task.id}", "body": {"priority": 9}},
+        {"method": "DELETE", "path": f"/users/{u_id}/tasks/{task.id}"},
+    ]})
+    data = response.get_json()
+    assert data["committed"] is False
+    assert [r["status"] for r in data["results"]] == [201, 422, 424]
+    assert data["results"][2]["body"]["error"]["code"] == "batch_aborted"
+    assert db.session.query(Task).filter_by(name="Rolled back").count() == 0
+    assert db.session.get(Task, task.id) is not None
+
+def test_batch_atomic_commits(client, existing_users):
+    user, _ = existing_users
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"method": "POST", "path": f"/users/{user.id}/tasks", "body": {"name": "One"}},
+        {"method": "POST", "path": f"/users/{user.id}/tasks", "body": {"name": "Two"}},
+    ]})
+    assert response.get_json()["committed"] is True
+    db.session.expire_all()
+    assert db.session.query(Task).filter_by(user_id=user.id).count() == 2
+
+def test_batch_unknown_path(client):
+    response = client.post("/batch", json={"operations": [{"method": "GET", "path": "/nowhere"}]})
+    result = response.get_json()["results"][0]
+    assert result["status"] == 404
+    assert result["body"]["error"]["code"] == "not_found"
+
+def test_batch_invalid_input(client):
+    response = client.post("/batch", json={"operations": [{"method": "PUT", "path": "/users"}]})
+    assert response.status_code == 400
+    assert response.get_json()["error"]["code"] == "invalid_input"
+
+def test_batch_refuses_rate_limited_and_auth_operations(client, existing_users):
+    # These would skip their admission rules (and login throttling) in a batch
+    response = client.post("/batch", json={"operations": [
+        {"method": "POST", "path": "/auth/login", "body": {"username": "preexisting1", "password": "guess"}},
+        {"method": "POST", "path": "/auth/logout"},
+        {"method": "POST", "path": "/users", "body": {"username": "viabatch", "password": "password123"}},
+        {"method": "GET", "path": "/users"},
+    ]})
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == [400, 400, 400, 200]
+    assert results[0]["body"]["error"]["code"] == "invalid_operation"
+
+def test_batch_refuses_job_enqueuing_operations(client, existing_users):
+    # The job would be committed on its own even if the batch rolls back
+    user, _ = existing_users
+    response = client.post("/batch", json={"atomic": True, "operations": [
+        {"method": "POST", "path": f"/users/{user.id}/tasks", "body": {"name": "Rolled back"}},
+        {"method": "POST", "path": f"/users/{user.id}/tasks/export"},
+    ]})
+    data = response.get_json()
+    assert data["committed"] is False
+    assert [r["status"] for r in data["results"]] == [201, 400]
+    assert data["results"][1]["body"]["error"]["code"] == "invalid_operation"
+    assert db.session.query(Task).filter_by(name="Rolled back").count() == 0
+    assert db.session.query(Job).count() == 0
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+from app.models import Task, TaskChange, record_task_changes
+
+
+def get_changes(client, user_id, **params):
+    response = client.get(f"/users/{user_id}/tasks/changes", query_string=params)
+    assert response.status_code == 200
+    return response.get_json()
+
+def test_inserts_appear_in_feed(client, existing_tasks):
+    task1, task2 = existing_tasks
+    data = get_changes(client, task1.user_id)
+    assert [c["task_id"] for c in data["changes"]] == [task1.id, task2.id]
+    assert all(c["op"] == "upsert" for c in data["changes"])
+    assert data["changes"][0]["task"]["name"] == task1.name
+    assert data["has_more"] is False
+
+def test_only_delta_since_seq(client, existing_tasks):
+    task1, task2 = existing_tasks
+    since = get_changes(client, task1.user_id)["next_since"]
+
+    client.patch(f"/users/{task1.user_id}/tasks/{task1.id}", json={"priority": 3})
+    client.delete(f"/users/{task1.user_id}/tasks/{task2.id}")
+    data = get_changes(client, task1.user_id, since=since)
+
+    assert [(c["task_id"], c["op"]) for c in data["changes"]] == [(task1.id, "upsert"), (task2.id, "delete")]
+    assert data["changes"][0]["task"]["priority"] == 3
+
+def test_bulk_operations_recorded(client, existing_tasks):
+    task1, task2 = existing_tasks
+    user_id = task1.user_id
+    since = get_changes(client, user_id)["next_since"]
+
+    client.patch(f"/users/{user_id}/tasks", json={"filter": {"priority": 2}, "changes": {"priority": 1}})
+    client.delete(f"/users/{user_id}/tasks", json={"tasks": [task2.id]})
+    data = get_changes(client, user_id, since=since)
+    assert [(c["task_id"], c["op"]) for c in data["changes"]] == [(task1.id, "upsert"), (task2.id, "delete")]
+
+def test_user_cascade_leaves_tombstones(client, existing_tasks):
+    task1, task2 = existing_tasks
+    user_id, task_ids = task1.user_id, sorted([task1.id, task2.id])
+    client.delete("/users", json={"users": [user_id]})
+
+    rows = db.session.execute(
+        db.text("SELECT task_id FROM task_changes WHERE user_id = :u AND op = 'delete'"), {"u": user_id}
+    ).scalars().all()
+    assert sorted(rows) == task_ids
+
+def test_feed_pagination(client, existing_users):
+    user, _ = existing_users
+    for i in range(5):
+        db.session.add(Task(name=f"Task {i}", owner=user))
+    db.session.commit()
+
+    first = get_changes(client, user.id, limit=3)
+    assert len(first["changes"]) == 3
+    assert first["has_more"] is True
+    second = get_changes(client, user.id, since=first["next_since"], limit=3)
+    assert len(second["changes"]) == 2
+    assert second["has_more"] is False
+
+def test_interleaved_writers_commit_in_seq_order(tmp_path):
+    # Writer B starts while A's change (seq 1) is uncommitted. B must not be
+    # able to commit seq 2 first, or a reader at since=0 would skip seq 1.
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'feed.db'}", connect_args={"timeout": 0.1})
+    TaskChange.__table__.create(engine)
+
+    with engine.connect() as writer_a, engine.connect() as writer_b:
+        writer_a.begin()
+        record_task_changes(writer_a, [(1, 10)], "upsert")
+
+        writer_b.begin()
+        with pytest.raises(OperationalError, match="locked"):
+            record_task_changes(writer_b, [(1, 11)], "upsert")
+        writer_b.rollback()
+
+        writer_a.commit()
+        with writer_b.begin():
+            record_task_changes(writer_b, [(1, 11)], "upsert")
+
+    with engine.connect() as reader:
+        rows = reader.execute(sa.select(TaskChange.seq, TaskChange.task_id).order_by(TaskChange.seq)).all()
+    assert [tuple(row) for row in rows] == [(1, 10), (2, 11)]
+
+def test_postgres_writers_lock_feed_per_user_before_insert():
+    statements = []
+    connection = SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        execute=lambda stmt, params=None: statements.append((str(stmt), params)),
+    )
+    record_task_changes(connection, [(2, 10), (1, 11), (2, 12)], "upsert")
+
+    locks = [params["user_id"] for stmt, params in statements if "pg_advisory_xact_lock" in stmt]
+    assert locks == [1, 2]
+    assert statements[-1][0].startswith("INSERT INTO task_changes")
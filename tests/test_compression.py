@@ -0,0 +1,46 @@
+import gzip
+import zlib
+from app.extensions import db
+from app.models import Task
+
+
+def add_tasks(user, count):
+    for i in range(count):
+        db.session.add(Task(name=f"Task {i}", description="Repetitive description " * 5, owner=user))
+    db.session.commit()
+
+
+def test_large_list_is_gzipped(client, existing_users):
+    user, _ = existing_users
+    add_tasks(user, 20)
+    plain = client.get(f"/users/{user.id}/tasks")
+    response = client.get(f"/users/{user.id}/tasks", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert len(response.get_data()) < len(plain.get_data())
+
+def test_deflate_when_preferred(client, existing_users):
+    user, _ = existing_users
+    add_tasks(user, 20)
+    response = client.get(f"/users/{user.id}/tasks", headers={"Accept-Encoding": "gzip;q=0.5, deflate"})
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert b'"tasks"' in zlib.decompress(response.get_data())
+
+def test_small_response_not_compressed(client):
+    response = client.get("/users/999", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 404
+    assert "Content-Encoding" not in response.headers
+
+def test_streamed_above_threshold(client, app, existing_users):
+    app.config["COMPRESSION_STREAM_THRESHOLD"] = 1000
+    user, _ = existing_users
+    add_tasks(user, 20)
+    plain = client.get(f"/users/{user.id}/tasks")
+    response = client.get(f"/users/{user.id}/tasks", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.get_data()) == plain.get_data()
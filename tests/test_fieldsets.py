@@ -0,0 +1,47 @@
+from sqlalchemy import event
+from app.extensions import db
+
+
+def test_sparse_task_list(client, existing_tasks):
+    task, _ = existing_tasks
+    response = client.get(f"/users/{task.user_id}/tasks?fields=id,name,deadline")
+    assert response.status_code == 200
+    for item in response.get_json()["tasks"]:
+        assert set(item) == {"id", "name", "deadline"}
+
+def test_sparse_fields_limit_select(client, app, existing_tasks):
+    task, _ = existing_tasks
+    user_id = task.user_id
+    db.session.expunge_all()
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        client.get(f"/users/{user_id}/tasks?fields=id,name")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    task_select = next(s for s in statements if "FROM tasks" in s and "tasks.user_id = ?" in s)
+    assert "tasks.description" not in task_select
+    assert "tasks.name" in task_select
+
+def test_sparse_nested_owner(client, existing_tasks):
+    task, _ = existing_tasks
+    response = client.get(f"/users/{task.user_id}/tasks/{task.id}?fields=name,owner")
+    assert response.status_code == 200
+    assert response.get_json() == {"name": task.name, "owner": {"id": task.user_id, "username": task.owner.username}}
+
+def test_sparse_user_list(client, existing_users):
+    response = client.get("/users?fields=username")
+    assert response.status_code == 200
+    assert all(set(user) == {"username"} for user in response.get_json()["users"])
+
+def test_unknown_field_rejected(client, existing_users):
+    response = client.get("/users?fields=username,password_hash")
+    assert response.status_code == 400
+    data = response.get_json()
+    assert data["error"]["code"] == "invalid_fields"
+    assert data["error"]["details"] == ["password_hash"]
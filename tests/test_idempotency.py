@@ -0,0 +1,69 @@
+from app.extensions import db
+from app.idempotency import IdempotencyStore
+from app.models import IdempotencyKey, Task
+
+
+def test_post_task_replayed(client, existing_users):
+    user, _ = existing_users
+    headers = {"Idempotency-Key": "abc-123"}
+    first = client.post(f"/users/{user.id}/tasks", json={"name": "Once"}, headers=headers)
+    second = client.post(f"/users/{user.id}/tasks", json={"name": "Once"}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.get_json() == first.get_json()
+    assert db.session.query(Task).filter_by(name="Once").count() == 1
+
+def test_key_reused_with_other_payload(client, existing_users):
+    user, _ = existing_users
+    headers = {"Idempotency-Key": "abc-123"}
+    client.post(f"/users/{user.id}/tasks", json={"name": "First"}, headers=headers)
+    response = client.post(f"/users/{user.id}/tasks", json={"name": "Second"}, headers=headers)
+    assert response.status_code == 422
+    assert response.get_json()["error"]["code"] == "idempotency_key_reused"
+
+def test_bulk_delete_replayed(client, existing_tasks):
+    task, _ = existing_tasks
+    url, payload = f"/users/{task.user_id}/tasks", {"tasks": [task.id]}
+    headers = {"Idempotency-Key": "delete-1"}
+    first = client.delete(url, json=payload, headers=headers)
+    second = client.delete(url, json=payload, headers=headers)
+    # Without the key the retry would fail with resource_mismatch
+    assert first.status_code == second.status_code == 200
+
+def test_store_is_shared_between_workers(app):
+    # Every worker has its own store object, the keys live in the database
+    first_worker, second_worker = app.extensions["idempotency"], IdempotencyStore(app)
+    scope = ("POST", "/users", "shared")
+    assert first_worker.begin(scope, "fp") == ("new", None)
+    assert second_worker.begin(scope, "fp") == ("in_progress", None)
+
+    first_worker.finish(scope, {"id": 1}, 201)
+    assert second_worker.begin(scope, "fp") == ("replay", ({"id": 1}, 201))
+
+def test_store_expires_entries(app):
+    store = app.extensions["idempotency"]
+    store.ttl = -1
+    store.begin(("POST", "/users", "old"), "fp")
+    store.finish(("POST", "/users", "old"), {}, 201)
+    assert store.begin(("POST", "/users", "old"), "fp")[0] == "new"
+
+def test_store_sweeps_expired_keys(app):
+    store = app.extensions["idempotency"]
+    store.ttl = -1
+    for key in ("a", "b"):
+        store.begin(("POST", "/users", key), "fp")
+        store.finish(("POST", "/users", key), {}, 201)
+
+    store.ttl, store.last_sweep = 3600, 0.0
+    store.begin(("POST", "/users", "c"), "fp")
+    assert db.session.query(IdempotencyKey).count() == 1
+
+def test_abandoned_pending_key_is_reclaimed(app):
+    store = app.extensions["idempotency"]
+    scope = ("POST", "/users", "crashed")
+    store.begin(scope, "fp")
+    assert store.begin(scope, "fp")[0] == "in_progress"
+
+    store.pending_timeout = -1
+    assert store.begin(scope, "fp")[0] == "new"
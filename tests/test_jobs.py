@@ -0,0 +1,163 @@
+from datetime import timedelta
+import pytest
+from app.extensions import db
+from app.jobs import HANDLERS, Worker, job_handler, jobs, _now
+from app.models import Task, User
+
+
+def work(app):
+    return Worker(app.extensions["jobs"], worker_id="test").run(burst=True)
+
+@pytest.fixture
+def flaky_handler():
+    calls = []
+
+    @job_handler("flaky")
+    def flaky(context, payload):
+        calls.append(payload)
+        if len(calls) < payload["fail_times"] + 1:
+            raise RuntimeError("temporary outage")
+        return {"calls": len(calls)}
+
+    yield calls
+    del HANDLERS["flaky"]
+
+def make_due(job_id):
+    with db.engine.begin() as conn:
+        conn.execute(jobs.update().where(jobs.c.id == job_id).values(run_after=_now()))
+
+def test_export_returns_202_and_completes(app, client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    response = client.post(f"/users/{user_id}/tasks/export")
+
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job["status"] == "queued"
+    assert response.headers["Location"].endswith(f"/jobs/{job['id']}")
+
+    assert work(app) == 1
+
+    status = client.get(f"/jobs/{job['id']}").get_json()
+    assert status["status"] == "succeeded"
+    assert status["progress"] == {"done": 2, "total": 2}
+    result_link = next(link["href"] for link in status["links"] if link["rel"] == "result")
+
+    result = client.get(result_link).get_json()["result"]
+    assert result["count"] == 2
+    assert {task["name"] for task in result["tasks"]} == {"Skillbox hw", None}
+
+def test_result_before_completion_is_409(client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    job_id = client.post(f"/users/{user_id}/tasks/export").get_json()["id"]
+
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 409
+    assert response.get_json()["error"]["code"] == "job_not_finished"
+
+def test_async_user_purge(app, client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    response = client.delete(f"/users/{user_id}", headers={"Prefer": "respond-async"})
+
+    assert response.status_code == 202
+    work(app)
+
+    assert db.session.get(User, user_id) is None
+    assert db.session.query(Task).filter_by(user_id=user_id).count() == 0
+    job = client.get(response.headers["Location"]).get_json()
+    assert job["status"] == "succeeded"
+
+def test_async_bulk_update_by_filter(app, client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    response = client.patch(f"/users/{user_id}/tasks", headers={"Prefer": "respond-async"},
+                            json={"filter": {"priority": 1}, "changes": {"priority": 3}})
+
+    assert response.status_code == 202
+    work(app)
+
+    db.session.expire_all()
+    assert sorted(task.priority for task in db.session.query(Task).filter_by(user_id=user_id)) == [2, 3]
+
+def test_async_bulk_update_is_validated_up_front(client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    response = client.patch(f"/users/{user_id}/tasks", headers={"Prefer": "respond-async"},
+                            json={"changes": {"priority": 9}})
+
+    assert response.status_code == 422
+
+def test_async_bulk_update_cannot_change_id(app, client, existing_tasks):
+    user_id, task_id = existing_tasks[0].user_id, existing_tasks[0].id
+    response = client.patch(f"/users/{user_id}/tasks", headers={"Prefer": "respond-async"},
+                            json={"filter": {"ids": [task_id]}, "changes": {"id": 555}})
+    assert response.status_code == 422
+
+    # A payload queued some other way fails for good instead of being retried
+    queue = app.extensions["jobs"]
+    job_id = queue.enqueue("bulk_update_tasks", {"user_id": user_id, "changes": {"id": 555}}, user_id=user_id)
+    work(app)
+
+    assert queue.get(job_id).status == "failed"
+    assert queue.get(job_id).attempts == 1
+    assert db.session.get(Task, 555) is None
+
+def test_failed_job_is_retried_with_backoff(app, flaky_handler):
+    queue = app.extensions["jobs"]
+    job_id = queue.enqueue("flaky", {"fail_times": 1})
+
+    before = _now()
+    assert work(app) == 1
+    job = queue.get(job_id)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.error == "temporary outage"
+    assert job.run_after > before
+
+    # Not due yet, the worker leaves it alone
+    assert work(app) == 0
+
+    make_due(job_id)
+    work(app)
+    job = queue.get(job_id)
+    assert job.status == "succeeded"
+    assert job.result == {"calls": 2}
+
+def test_job_fails_after_max_attempts(app, flaky_handler):
+    queue = app.extensions["jobs"]
+    queue.max_attempts = 2
+    job_id = queue.enqueue("flaky", {"fail_times": 5})
+
+    work(app)
+    make_due(job_id)
+    work(app)
+
+    job = queue.get(job_id)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.finished_at is not None
+
+def test_abandoned_job_is_reclaimed(app, flaky_handler):
+    queue = app.extensions["jobs"]
+    job_id = queue.enqueue("flaky", {"fail_times": 0})
+    assert queue.claim("dead-worker").id == job_id
+
+    # Still locked by the dead worker
+    assert work(app) == 0
+
+    with db.engine.begin() as conn:
+        conn.execute(jobs.update().where(jobs.c.id == job_id)
+                     .values(locked_at=_now() - timedelta(seconds=queue.lock_timeout + 1)))
+    assert work(app) == 1
+    assert queue.get(job_id).status == "succeeded"
+    assert queue.get(job_id).attempts == 2
+
+def test_backoff_grows_and_is_capped(app):
+    queue = app.extensions["jobs"]
+    delays = [queue.backoff(attempt) for attempt in range(1, 20)]
+
+    assert delays[0] <= queue.backoff_base
+    assert max(delays) <= queue.backoff_max
+
+def test_unknown_job_is_404(client):
+    response = client.get("/jobs/999")
+
+    assert response.status_code == 404
+    assert response.get_json()["error"]["code"] == "job_not_found"
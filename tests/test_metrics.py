@@ -0,0 +1,99 @@
+import json
+import os
+
+
+def test_metrics_exposition(client, existing_users):
+    client.get("/users")
+    client.get("/users/999")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    body = response.get_data(as_text=True)
+    assert "# TYPE taskpro_http_requests_total counter" in body
+    assert 'taskpro_http_requests_total{endpoint="userlistresource",method="GET",status="200"} 1' in body
+    assert 'taskpro_http_requests_total{endpoint="userresource",method="GET",status="404"} 1' in body
+    assert 'taskpro_http_request_duration_seconds_bucket{endpoint="userlistresource",method="GET",le="+Inf"} 1' in body
+
+def test_bulk_sizes_recorded(client, existing_tasks):
+    task1, task2 = existing_tasks
+    client.delete(f"/users/{task1.user_id}/tasks", json={"tasks": [task1.id, task2.id]})
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'taskpro_bulk_operation_size_sum{operation="task_bulk_delete"} 2' in body
+
+def test_snapshots_from_other_processes_are_summed(client, app, tmp_path):
+    metrics = app.extensions["metrics"]
+    metrics.directory = str(tmp_path)
+    labels = [["endpoint", "userlistresource"], ["method", "GET"], ["status", "200"]]
+    gauge = ["taskpro_db_pool_checked_out", [["bind", "default"]], 3]
+    for pid in (os.getppid(), 2 ** 22 + 1):  # a live process and one that has exited
+        (tmp_path / f"metrics-{pid}.json").write_text(json.dumps({
+            "pid": pid,
+            "counters": [["taskpro_http_requests_total", labels, 5]],
+            "histograms": [],
+            "gauges": [gauge],
+        }))
+
+    client.get("/users")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'taskpro_http_requests_total{endpoint="userlistresource",method="GET",status="200"} 11' in body
+    assert 'taskpro_db_pool_checked_out{bind="default"} 3' in body
+    assert list(tmp_path.glob(f"metrics-{os.getpid()}-*.json"))
+
+def test_reused_pid_does_not_overwrite_snapshot(app, tmp_path):
+    from app.metrics import MetricsRegistry
+
+    # Two registries in one process stand in for a dead worker and a new
+    # worker that was given the same pid
+    dead, respawned = app.extensions["metrics"], MetricsRegistry()
+    for registry in (dead, respawned):
+        registry.directory = str(tmp_path)
+    dead.inc("taskpro_http_requests_total", {"endpoint": "x", "method": "GET", "status": "200"}, 7)
+    dead.close()
+    respawned.inc("taskpro_http_requests_total", {"endpoint": "x", "method": "GET", "status": "200"}, 1)
+    respawned.close()
+
+    assert len(list(tmp_path.glob(f"metrics-{os.getpid()}-*.json"))) == 2
+    counters, _, _ = respawned.collect()
+    assert sum(counters.values()) == 8
+
+def test_close_flushes_pending_increments(app, tmp_path):
+    metrics = app.extensions["metrics"]
+    metrics.directory = str(tmp_path)
+    metrics.inc("taskpro_http_requests_total", {"endpoint": "x", "method": "GET", "status": "200"}, 3)
+    metrics.close()
+
+    [path] = tmp_path.glob("metrics-*.json")
+    assert json.loads(path.read_text())["counters"][0][2] == 3
+
+def test_concurrent_flushes_do_not_collide(app, tmp_path):
+    import threading
+    metrics = app.extensions["metrics"]
+    metrics.directory = str(tmp_path)
+    errors = []
+
+    def flush_repeatedly():
+        try:
+            with app.app_context():
+                for _ in range(100):
+                    metrics.flush()
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=flush_repeatedly) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [path.name for path in tmp_path.iterdir()] == [os.path.basename(metrics.own_snapshot_path())]
+
+def test_only_one_flush_per_interval(app, tmp_path):
+    metrics = app.extensions["metrics"]
+    metrics.directory = str(tmp_path)
+    metrics.flush()
+    flushed_at = metrics.last_flush
+
+    metrics.flush(min_interval=60)
+    assert metrics.last_flush == flushed_at
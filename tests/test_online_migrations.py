@@ -0,0 +1,49 @@
+import sqlalchemy as sa
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from app.extensions import db
+from app.models import Task
+from app.online_migrations import checkpoints, chunked_backfill, create_index_concurrently
+
+
+def add_tasks(user, count):
+    for i in range(count):
+        db.session.add(Task(name=f"Task {i}", priority=1, owner=user))
+    db.session.commit()
+
+def test_chunked_backfill(app, existing_users):
+    user, _ = existing_users
+    add_tasks(user, 7)
+    reports = []
+    with db.engine.connect() as conn:
+        updated = chunked_backfill(
+            conn, "tasks", {"priority": 3}, where="name != 'Task 0'", batch_size=2,
+            progress=lambda done, last, rows: reports.append(done)
+        )
+        remaining = conn.execute(sa.select(checkpoints.c.name)).all()
+
+    assert updated == 6
+    assert reports == [2, 4, 6, 7]
+    assert remaining == []
+    priorities = db.session.execute(sa.text("SELECT name, priority FROM tasks")).all()
+    assert all(p == (1 if name == "Task 0" else 3) for name, p in priorities)
+
+def test_chunked_backfill_resumes(app, existing_users):
+    user, _ = existing_users
+    add_tasks(user, 5)
+    with db.engine.connect() as conn:
+        checkpoints.create(conn, checkfirst=True)
+        conn.execute(checkpoints.insert().values(name="resume-test", last_key=3))
+        conn.commit()
+        updated = chunked_backfill(conn, "tasks", {"priority": 2}, name="resume-test", batch_size=10)
+
+    assert updated == 2
+    rows = db.session.execute(sa.text("SELECT id, priority FROM tasks ORDER BY id")).all()
+    assert [p for _, p in rows] == [1, 1, 1, 2, 2]
+
+def test_create_index_falls_back_on_sqlite(app):
+    with db.engine.connect() as conn:
+        with Operations.context(MigrationContext.configure(conn)):
+            create_index_concurrently("ix_tasks_priority", "tasks", ["priority"])
+        indexes = {ix["name"] for ix in sa.inspect(conn).get_indexes("tasks")}
+    assert "ix_tasks_priority" in indexes
@@ -0,0 +1,26 @@
+import os
+import pstats
+import pytest
+
+
+@pytest.fixture
+def profiled_client(make_app, tmp_path):
+    app = make_app(PROFILER_ENABLED=True, PROFILER_SECRET="s3cret", PROFILER_DIR=str(tmp_path), PROFILER_MAX_FILES=2)
+    return app.test_client()
+
+def test_secret_header_writes_profile(profiled_client, tmp_path):
+    response = profiled_client.get("/users", headers={"X-Profile": "s3cret", "X-Request-ID": "req-42"})
+    assert response.status_code == 200
+    filename = response.headers["X-Profile-File"]
+    assert "userlistresource" in filename and "req-42" in filename
+    assert pstats.Stats(str(tmp_path / filename)).total_calls > 0
+
+def test_wrong_secret_not_profiled(profiled_client, tmp_path):
+    response = profiled_client.get("/users", headers={"X-Profile": "guess"})
+    assert "X-Profile-File" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+def test_retention_keeps_newest(profiled_client, tmp_path):
+    for i in range(4):
+        profiled_client.get("/users", headers={"X-Profile": "s3cret", "X-Request-ID": f"r{i}"})
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,45 @@
+import pytest
+from app.extensions import db
+from app.models import Task, User
+from app.readpath import light_rows, light_select
+from app.schemas import TaskSchema, UserSchema
+
+
+@pytest.mark.parametrize("fields", [None, "name,deadline", "owner"])
+def test_task_list_matches_orm_dump(client, existing_tasks, fields):
+    user_id = existing_tasks[0].user_id
+    url = f"/users/{user_id}/tasks" + (f"?fields={fields}" if fields else "")
+    only = tuple(sorted(fields.split(","))) if fields else None
+
+    with client.application.test_request_context():
+        tasks = db.session.execute(db.select(Task).where(Task.user_id == user_id)).scalars().all()
+        expected = (TaskSchema(only=only) if only else TaskSchema()).dump(tasks, many=True)
+
+    assert client.get(url).get_json()["tasks"] == expected
+
+def test_user_list_matches_orm_dump(client, existing_users):
+    with client.application.test_request_context():
+        expected = UserSchema().dump(db.session.execute(db.select(User).order_by(User.id)).scalars(), many=True)
+
+    assert client.get("/users").get_json()["users"] == expected
+
+def test_lists_leave_identity_map_empty(client, existing_tasks):
+    user_id = existing_tasks[0].user_id
+    db.session.expunge_all()
+
+    assert client.get(f"/users/{user_id}/tasks").status_code == 200
+    assert client.get("/users").status_code == 200
+    assert len(db.session.identity_map) == 0
+
+def test_light_select_only_fetches_requested_columns(app):
+    stmt, row_cls = light_select(TaskSchema, ("name",), extra=("owner",))
+
+    assert [column.key for column in stmt.selected_columns] == ["id", "name", "user_id"]
+    assert row_cls.__slots__ == ("id", "name", "user_id", "owner")
+
+def test_light_rows_set_extra_values(app, existing_tasks):
+    stmt, row_cls = light_select(TaskSchema, ("name",), extra=("owner",))
+    rows = light_rows(db.session.execute(stmt.order_by(Task.id)), row_cls, owner="shared")
+
+    assert [(row.name, row.owner) for row in rows] == [("Skillbox hw", "shared"), (None, "shared")]
+    assert not hasattr(rows[0], "__dict__")
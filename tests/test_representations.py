@@ -0,0 +1,32 @@
+import pytest
+
+
+def test_json_is_default(client, existing_users):
+    response = client.get("/users")
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert len(response.get_json()["users"]) == 2
+
+def test_json_stdlib_fallback(client, existing_users, monkeypatch):
+    from app import representations
+    fast = client.get("/users").get_json()
+    monkeypatch.setattr(representations, "orjson", None)
+    response = client.get("/users")
+    assert response.get_json() == fast
+    assert response.get_data().endswith(b"\n")
+
+def test_msgpack_negotiation(client, existing_tasks):
+    msgpack = pytest.importorskip("msgpack")
+    task, _ = existing_tasks
+    json_body = client.get(f"/users/{task.user_id}/tasks").get_json()
+    response = client.get(f"/users/{task.user_id}/tasks", headers={"Accept": "application/msgpack"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/msgpack"
+    assert msgpack.unpackb(response.get_data()) == json_body
+
+def test_msgpack_error_response(client):
+    msgpack = pytest.importorskip("msgpack")
+    response = client.get("/users/999", headers={"Accept": "application/msgpack"})
+    assert response.status_code == 404
+    assert msgpack.unpackb(response.get_data())["error"]["code"] == "user_not_found"
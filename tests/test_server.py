@@ -0,0 +1,50 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(url, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return urllib.request.urlopen(url, timeout=1)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+def test_prefork_server_serves_and_drains(tmp_path):
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'server.db'}",
+        SERVER_HOST="127.0.0.1",
+        SERVER_PORT=str(port),
+        SERVER_WORKERS="2",
+        # A worker that fails to drain shows up as a timeout, not a 30s hang
+        SERVER_GRACEFUL_TIMEOUT="5",
+    )
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "serve.py")], cwd=tmp_path, env=env)
+    try:
+        response = wait_for(f"http://127.0.0.1:{port}/admission")
+        assert response.status == 200
+
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+    log = (tmp_path / "logs" / "taskpro.log").read_text()
+    assert log.count("drained") == 2
@@ -0,0 +1,84 @@
+import pytest
+import sqlalchemy as sa
+from app.sharding import SHARD_SLOTS, create_all_shards, get_shard_map
+
+
+@pytest.fixture
+def sharded_app(make_app, tmp_path):
+    app = make_app(SHARDS={
+        "shard0": f"sqlite:///{tmp_path / 'shard0.db'}",
+        "shard1": f"sqlite:///{tmp_path / 'shard1.db'}",
+    })
+    create_all_shards()
+    return app
+
+@pytest.fixture
+def sharded_client(sharded_app):
+    return sharded_app.test_client()
+
+def create_users(client, count):
+    ids = []
+    for i in range(count):
+        response = client.post("/users", json={"username": f"user{i}", "password": "password123"})
+        assert response.status_code == 201
+        ids.append(response.get_json()["id"])
+    return ids
+
+def rows_in(shard, table):
+    with get_shard_map().engines[shard].connect() as conn:
+        return conn.execute(sa.text(f"SELECT id FROM {table}")).scalars().all()
+
+def test_users_spread_and_routed_by_id(sharded_client):
+    ids = create_users(sharded_client, 8)
+    by_shard = {name: rows_in(name, "users") for name in ("shard0", "shard1")}
+
+    assert by_shard["shard0"] and by_shard["shard1"]
+    assert sorted(by_shard["shard0"] + by_shard["shard1"]) == sorted(ids)
+    assert all(uid % SHARD_SLOTS == 0 for uid in by_shard["shard0"])
+    assert all(uid % SHARD_SLOTS == 1 for uid in by_shard["shard1"])
+    for uid in ids:
+        assert sharded_client.get(f"/users/{uid}").status_code == 200
+
+def test_tasks_live_with_their_owner(sharded_client):
+    ids = create_users(sharded_client, 6)
+    for uid in ids:
+        response = sharded_client.post(f"/users/{uid}/tasks", json={"name": f"Task of {uid}"})
+        assert response.status_code == 201
+        task_id = response.get_json()["id"]
+        assert task_id % SHARD_SLOTS == uid % SHARD_SLOTS
+        assert sharded_client.get(f"/users/{uid}/tasks/{task_id}").status_code == 200
+
+def test_user_list_fans_out(sharded_client):
+    ids = create_users(sharded_client, 6)
+    users = sharded_client.get("/users").get_json()["users"]
+    assert [u["id"] for u in users] == sorted(ids)
+
+def test_bulk_delete_across_shards(sharded_client):
+    ids = create_users(sharded_client, 6)
+    response = sharded_client.delete("/users", json={"users": ids[:4]})
+    assert response.status_code == 200
+    remaining = rows_in("shard0", "users") + rows_in("shard1", "users")
+    assert sorted(remaining) == sorted(ids[4:])
+
+def test_duplicate_username_rejected(sharded_client):
+    create_users(sharded_client, 1)
+    response = sharded_client.post("/users", json={"username": "user0", "password": "password123"})
+    assert response.status_code == 409
+
+def test_cross_shard_rename_rejected(sharded_client):
+    [uid] = create_users(sharded_client, 1)
+    shard_map = get_shard_map()
+    own_shard = shard_map.shard_for_id(uid)
+    names = (f"renamed{i}" for i in range(100))
+    foreign = next(n for n in names if shard_map.shard_for_username(n) != own_shard)
+    local = next(n for n in names if shard_map.shard_for_username(n) == own_shard)
+
+    response = sharded_client.patch(f"/users/{uid}", json={"username": foreign})
+    assert response.status_code == 409
+    assert response.get_json()["error"]["code"] == "username_unavailable"
+    # The name stays free for a new user on its own shard
+    assert sharded_client.post("/users", json={"username": foreign, "password": "password123"}).status_code == 201
+
+    assert sharded_client.patch(f"/users/{uid}", json={"username": local}).status_code == 200
+    login = sharded_client.post("/auth/login", json={"username": local, "password": "password123"})
+    assert login.get_json()["user_id"] == uid
@@ -0,0 +1,10 @@
+from app import create_app
+from conftest import TestConfig
+
+
+def test_serving_mode_skips_migrate(app):
+    class ServingConfig(TestConfig):
+        SERVING_MODE = True
+
+    assert "migrate" in app.extensions
+    assert "migrate" not in create_app(ServingConfig).extensions
@@ -119,4 +119,55 @@ def test_delete_task_success(client, existing_tasks):
     assert response.status_code == 204
     assert db.session.get(Task, task.id) is None
 
-# endregion
\ No newline at end of file
+# endregion
+# region test bulk PATCH
+
+def test_bulk_patch_by_ids(client, existing_tasks):
+    task1, task2 = existing_tasks
+    response = client.patch(f"/users/{task1.user_id}/tasks", json={"tasks": [
+        {"id": task1.id, "priority": 3},
+        {"id": task2.id, "priority": 3, "name": "Renamed"},
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 2
+    db.session.expire_all()
+    assert db.session.get(Task, task1.id).priority == 3
+    assert db.session.get(Task, task2.id).name == "Renamed"
+
+def test_bulk_patch_by_filter(client, existing_tasks):
+    task1, task2 = existing_tasks
+    response = client.patch(f"/users/{task1.user_id}/tasks", json={
+        "filter": {"priority": 1},
+        "changes": {"deadline": "2030-01-01 12:00"}
+    })
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == 1
+    db.session.expire_all()
+    assert db.session.get(Task, task2.id).deadline == datetime(2030, 1, 1, 12, 0)
+    assert db.session.get(Task, task1.id).deadline == datetime(2025, 12, 31, 23, 59)
+
+def test_bulk_patch_by_filter_cannot_change_id(client, existing_tasks):
+    task1, task2 = existing_tasks
+    response = client.patch(f"/users/{task1.user_id}/tasks", json={
+        "filter": {"ids": [task1.id]},
+        "changes": {"id": 555}
+    })
+    assert response.status_code == 422
+    assert "id" in response.get_json()["error"]["details"]
+    db.session.expire_all()
+    assert sorted(db.session.scalars(db.select(Task.id))) == sorted([task1.id, task2.id])
+
+def test_bulk_patch_validation_error(client, existing_tasks):
+    task1, _ = existing_tasks
+    response = client.patch(f"/users/{task1.user_id}/tasks", json={"tasks": [{"id": task1.id, "priority": 7}]})
+    assert response.status_code == 422
+    assert "priority" in response.get_json()["error"]["details"]["0"]
+
+def test_bulk_patch_foreign_task(client, existing_users, existing_tasks):
+    _, user2 = existing_users
+    task1, _ = existing_tasks
+    response = client.patch(f"/users/{user2.id}/tasks", json={"tasks": [{"id": task1.id, "priority": 2}]})
+    assert response.status_code == 404
+    assert response.get_json()["error"]["code"] == "resource_mismatch"
+
+# endregion